@@ -0,0 +1,192 @@
+from src.models.user import db
+from src.models.incident import Incident, IncidentResponse, ArchivedIncident
+from sqlalchemy.dialects.sqlite import insert
+from datetime import datetime
+from types import SimpleNamespace
+import math
+
+# Log-scale histogram bins: bin 0 holds durations under a second, bin i
+# holds [GAMMA**(i-1), GAMMA**i) seconds. Percentiles read from the bins are
+# within GAMMA - 1 (5%) of the true value and bins from different keys or
+# hours simply add up.
+SKETCH_GAMMA = 1.05
+_LOG_GAMMA = math.log(SKETCH_GAMMA)
+
+DIMENSIONS = ('unit', 'call_type', 'hour')
+METRICS = ('turnout', 'travel', 'response', 'on_scene')  # dispatch->responding, responding->on_scene, dispatch->on_scene, on_scene->clear
+PERCENTILES = (50, 90, 95)
+
+class ResponseMetric(db.Model):
+    """One histogram bin of one response-time metric for one unit, call type or hour"""
+    __tablename__ = 'response_metric'
+
+    id = db.Column(db.Integer, primary_key=True)
+    dimension = db.Column(db.String(20), nullable=False)  # unit, call_type, hour
+    key = db.Column(db.String(100), nullable=False)  # FM-1, Structure Fire, 2024-05-01T14:00
+    metric = db.Column(db.String(20), nullable=False)  # turnout, travel, response, on_scene
+    bin = db.Column(db.Integer, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total_seconds = db.Column(db.Float, nullable=False, default=0)
+    min_seconds = db.Column(db.Float)
+    max_seconds = db.Column(db.Float)
+
+    __table_args__ = (
+        db.UniqueConstraint('dimension', 'key', 'metric', 'bin', name='uq_response_metric_bin'),
+    )
+
+    def __repr__(self):
+        return f'<ResponseMetric {self.dimension}={self.key} {self.metric}[{self.bin}]: {self.count}>'
+
+def sketch_bin(seconds):
+    if seconds < 1:
+        return 0
+    return 1 + int(math.log(seconds) / _LOG_GAMMA)
+
+def hour_key(timestamp):
+    return timestamp.strftime('%Y-%m-%dT%H:00')
+
+def transition_metrics(incident, response, status, timestamp):
+    """Durations in seconds completed by a unit moving to status at timestamp"""
+    if status == 'responding':
+        intervals = {'turnout': incident.created_at}
+    elif status == 'on_scene':
+        intervals = {'travel': response.responded_at, 'response': incident.created_at}
+    elif status == 'clear':
+        intervals = {'on_scene': response.on_scene_at}
+    else:
+        intervals = {}
+    return {metric: max((timestamp - start).total_seconds(), 0.0)
+            for metric, start in intervals.items() if start is not None}
+
+def record_transitions(transitions):
+    """Fold unit status transitions into the rollups within the current transaction.
+
+    transitions is an iterable of (incident, response, status, timestamp).
+    Each metric only reads times earlier than status, so this works before
+    or after the response itself is updated. Each sample becomes one upsert
+    per dimension, so the rollups cost O(1) per transition and never need
+    the incidents re-read.
+    """
+    rows = []
+    for incident, response, status, timestamp in transitions:
+        keys = {'unit': response.user_id, 'call_type': incident.incident_type,
+                'hour': hour_key(incident.created_at or timestamp)}
+        for metric, seconds in transition_metrics(incident, response, status, timestamp).items():
+            for dimension, key in keys.items():
+                rows.append({'dimension': dimension, 'key': key, 'metric': metric, 'bin': sketch_bin(seconds),
+                             'count': 1, 'total_seconds': seconds, 'min_seconds': seconds, 'max_seconds': seconds})
+    if not rows:
+        return
+
+    statement = insert(ResponseMetric)
+    statement = statement.on_conflict_do_update(
+        index_elements=['dimension', 'key', 'metric', 'bin'],
+        set_={
+            'count': ResponseMetric.count + statement.excluded.count,
+            'total_seconds': ResponseMetric.total_seconds + statement.excluded.total_seconds,
+            'min_seconds': db.func.min(ResponseMetric.min_seconds, statement.excluded.min_seconds),
+            'max_seconds': db.func.max(ResponseMetric.max_seconds, statement.excluded.max_seconds)
+        }
+    )
+    db.session.execute(statement, rows)
+
+def record_transition(incident, response, status, timestamp):
+    record_transitions([(incident, response, status, timestamp)])
+
+def summarize(bins):
+    """Count, mean, min, max and percentiles from one key's histogram bins"""
+    bins = sorted(bins, key=lambda row: row.bin)
+    count = sum(row.count for row in bins)
+    summary = {
+        'count': count,
+        'mean_seconds': sum(row.total_seconds for row in bins) / count if count else None,
+        'min_seconds': min(row.min_seconds for row in bins) if bins else None,
+        'max_seconds': max(row.max_seconds for row in bins) if bins else None
+    }
+    for percentile in PERCENTILES:
+        rank = math.ceil(count * percentile / 100)
+        seen = 0
+        value = None
+        for row in bins:
+            seen += row.count
+            if seen >= rank:
+                value = row.total_seconds / row.count  # The bin's exact mean stands in for its members
+                break
+        summary[f'p{percentile}_seconds'] = value
+    return summary
+
+def response_time_rollups(dimension, key=None, metric=None, since=None, until=None):
+    """Summaries per (key, metric) for a dimension, read from the rollup bins only.
+
+    since/until bound the hour dimension by its hour keys.
+    """
+    query = ResponseMetric.query.filter(ResponseMetric.dimension == dimension)
+    if key is not None:
+        query = query.filter(ResponseMetric.key == key)
+    if metric is not None:
+        query = query.filter(ResponseMetric.metric == metric)
+    if dimension == 'hour' and since is not None:
+        query = query.filter(ResponseMetric.key >= hour_key(since))
+    if dimension == 'hour' and until is not None:
+        query = query.filter(ResponseMetric.key <= hour_key(until))
+
+    groups = {}
+    for row in query:
+        groups.setdefault((row.key, row.metric), []).append(row)
+    return [dict({'dimension': dimension, 'key': group_key, 'metric': group_metric}, **summarize(bins))
+            for (group_key, group_metric), bins in sorted(groups.items())]
+
+RESPONSE_TIMESTAMPS = (('responding', 'responded_at'), ('on_scene', 'on_scene_at'), ('clear', 'cleared_at'))
+
+def _parse_timestamp(value):
+    return datetime.fromisoformat(value) if value else None
+
+def archived_transitions(archived):
+    """(incident, response, status, timestamp) transitions kept in an archived incident's payload"""
+    data = archived.payload_dict()
+    incident = SimpleNamespace(incident_type=data['incident_type'], created_at=_parse_timestamp(data['created_at']))
+    transitions = []
+    for unit in data.get('responding_units') or []:
+        response = SimpleNamespace(user_id=unit['user_id'],
+                                   **{field: _parse_timestamp(unit.get(field)) for _, field in RESPONSE_TIMESTAMPS})
+        transitions += [(incident, response, status, getattr(response, field))
+                        for status, field in RESPONSE_TIMESTAMPS if getattr(response, field) is not None]
+    return transitions
+
+def rebuild_response_rollups(batch_size=500):
+    """Recompute every rollup from IncidentResponse rows and archived incidents, e.g. after a bulk import or upgrade"""
+    ResponseMetric.query.delete()
+    last_id = 0
+    while True:
+        responses = IncidentResponse.query.filter(IncidentResponse.id > last_id).order_by(
+            IncidentResponse.id).limit(batch_size).all()
+        if not responses:
+            break
+        incidents = {incident.id: incident for incident in Incident.query.filter(
+            Incident.id.in_({response.incident_id for response in responses}))}
+
+        transitions = []
+        for response in responses:
+            incident = incidents[response.incident_id]
+            for status, field in RESPONSE_TIMESTAMPS:
+                if getattr(response, field) is not None:
+                    transitions.append((incident, response, status, getattr(response, field)))
+        record_transitions(transitions)
+        last_id = responses[-1].id
+        db.session.expunge_all()
+
+    # Archiving deletes the response rows, but each archived payload keeps its units' timestamps
+    last_id = 0
+    while True:
+        archived = ArchivedIncident.query.filter(ArchivedIncident.id > last_id).order_by(
+            ArchivedIncident.id).limit(batch_size).all()
+        if not archived:
+            break
+        # An interrupted archive run leaves the hot row too, and it was counted above
+        live = {incident_id for incident_id, in db.session.query(Incident.id).filter(
+            Incident.id.in_([incident.id for incident in archived]))}
+        record_transitions(transition for incident in archived if incident.id not in live
+                           for transition in archived_transitions(incident))
+        last_id = archived[-1].id
+        db.session.expunge_all()
+    db.session.commit()
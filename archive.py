@@ -0,0 +1,45 @@
+from src.models.incident import db, Incident, TimelineEntry, IncidentResponse, ArchivedIncident, IncidentTombstone, SyncCounter
+from src.models.search import index_archived_incidents
+from datetime import datetime, timedelta
+
+def archive_cleared_incidents(older_than_days, batch_size=200):
+    """Move cleared incidents older than the cutoff from the hot tables into the archive.
+
+    Each batch is written to the archive and committed before it is deleted
+    from the hot tables, so an interrupted run leaves a duplicate (reads
+    prefer the hot row) rather than a lost incident. Each removal leaves a
+    tombstone under a new change version for delta sync. Returns the number
+    of incidents archived.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    # SQLite reuses the highest rowid once it is deleted; keeping that row
+    # means a new incident can never take an archived incident's id.
+    max_id = db.session.query(db.func.max(Incident.id)).scalar() or 0
+
+    archived = 0
+    while True:
+        incidents = Incident.query.filter(
+            Incident.status == 'cleared',
+            db.func.coalesce(Incident.cleared_at, Incident.created_at) < cutoff,
+            Incident.id < max_id
+        ).order_by(Incident.id).limit(batch_size).all()
+        if not incidents:
+            break
+
+        archived_rows = [db.session.merge(ArchivedIncident.from_incident(incident)) for incident in incidents]
+        index_archived_incidents(archived_rows)
+        db.session.commit()
+
+        ids = [incident.id for incident in incidents]
+        TimelineEntry.query.filter(TimelineEntry.incident_id.in_(ids)).delete(synchronize_session=False)
+        IncidentResponse.query.filter(IncidentResponse.incident_id.in_(ids)).delete(synchronize_session=False)
+        Incident.query.filter(Incident.id.in_(ids)).delete(synchronize_session=False)
+        version = SyncCounter.next_version(db.session.connection())
+        db.session.add_all(IncidentTombstone(incident_id=incident_id, reason='archived', change_version=version)
+                           for incident_id in ids)
+        db.session.commit()
+        db.session.expunge_all()
+
+        archived += len(ids)
+
+    return archived
@@ -0,0 +1,73 @@
+"""Concurrent timeline appends against one incident; every note must land.
+
+    python bench_concurrency.py [--threads 8] [--notes 20]
+"""
+import os
+import sys
+# Same layout as main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import tempfile
+import threading
+import time
+from collections import Counter
+from flask import Flask
+from src.models.user import db
+from src.models.incident import Incident
+from src.routes.incidents import incidents_bp
+from src.sqlite_profile import init_db_engine
+from src.json_codec import FastJSONProvider
+
+def build_app():
+    folder = tempfile.mkdtemp()
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(folder, 'app.db')}"
+    app.config['SQLALCHEMY_BINDS'] = {'archive': f"sqlite:///{os.path.join(folder, 'archive.db')}"}
+    init_db_engine(app, db)
+    app.register_blueprint(incidents_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+    return app
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--notes', type=int, default=20, help='notes per thread')
+    args = parser.parse_args()
+
+    app = build_app()
+    with app.app_context():
+        incident = Incident(incident_type='Structure Fire', location='Bench', address='1 Main St',
+                            priority=1, units_requested=1, created_by='BENCH')
+        db.session.add(incident)
+        db.session.commit()
+        incident_id = incident.id
+
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def post_notes(thread_number):
+        client = app.test_client()
+        for note in range(args.notes):
+            response = client.post(f'/api/incidents/{incident_id}/timeline', json={
+                'type': 'note', 'content': f'thread {thread_number} note {note}', 'user': f'FM-{thread_number}'
+            })
+            with lock:
+                statuses[response.status_code] += 1
+
+    threads = [threading.Thread(target=post_notes, args=(n,)) for n in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        landed = db.session.get(Incident, incident_id).timeline_entries.count()
+    expected = args.threads * args.notes
+    print(f'responses: {dict(statuses)}  landed: {landed}/{expected}  '
+          f'({expected / elapsed:.0f} appends/s)')
+    sys.exit(0 if landed == statuses[200] else 1)
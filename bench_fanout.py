@@ -0,0 +1,126 @@
+"""Socket.IO emit fan-out through a message queue as workers are added.
+
+    python bench_fanout.py --queue redis://localhost:6379/0 [--workers 1 2 4 8] [--clients 500] [--emits 200]
+    python bench_fanout.py --fake-redis [...]
+
+Each worker is a separate process running Flask-SocketIO with message_queue=,
+as main.py does, with real Engine.IO sessions joined to a role room. A
+write-only emitter publishes push notifications through the queue and each
+worker drains its clients' long-polling queues until every notification has
+arrived, so each delivery is published, received, encoded and handed to an
+Engine.IO socket. Clients poll in-process through the WSGI app, so network
+I/O and the proxy are not measured. --fake-redis starts an in-process
+fakeredis server (pip install fakeredis) for machines without Redis; the
+numbers then reflect fakeredis, not Redis.
+"""
+import os
+import sys
+# Same layout as main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import json
+import multiprocessing
+import socket
+import time
+from flask import Flask
+from flask_socketio import SocketIO, join_room
+from src import json_codec
+from src.realtime import is_shared_queue
+
+ROOM = 'role_fire_marshal'
+NOTIFICATION = {
+    'type': 'new_incident',
+    'title': 'New Emergency Call',
+    'message': 'Structure Fire at 4410 Elm Street',
+    'incident_id': 1,
+    'priority': 1
+}
+POLLING = '/socket.io/?EIO=4&transport=polling'
+WORKER_TIMEOUT = 120
+
+def connect_client(http):
+    """Open an Engine.IO session and connect it to the default namespace; returns its polling URL"""
+    handshake = http.get(POLLING).get_data(as_text=True)
+    url = f"{POLLING}&sid={json.loads(handshake[1:])['sid']}"
+    http.post(url, data='40')
+    assert http.get(url).get_data(as_text=True).startswith('40')
+    return url
+
+def run_worker(url, clients, emits, ready, done):
+    """A Socket.IO server whose clients sit in ROOM; sets done once each client has received emits events"""
+    app = Flask(__name__)
+    server = SocketIO(app, message_queue=url, json=json_codec, async_mode='threading')
+
+    @server.on('connect')
+    def connect(auth=None):
+        join_room(ROOM)
+
+    http = app.test_client()
+    sessions = [connect_client(http) for _ in range(clients)]
+    ready.set()
+    for session in sessions:
+        received = 0
+        while received < emits:
+            records = http.get(session).get_data(as_text=True).split('\x1e')
+            received += sum(record.startswith('42') for record in records)
+    done.set()
+
+def run(url, workers, clients, emits):
+    """Deliveries per second for emits to clients spread over workers"""
+    per_worker = clients // workers
+    readies = [multiprocessing.Event() for _ in range(workers)]
+    dones = [multiprocessing.Event() for _ in range(workers)]
+    processes = [multiprocessing.Process(target=run_worker, args=(url, per_worker, emits, ready, done), daemon=True)
+                 for ready, done in zip(readies, dones)]
+    for process in processes:
+        process.start()
+    for ready in readies:
+        ready.wait()
+    time.sleep(0.5)  # Let every worker's queue subscription settle before publishing
+
+    emitter = SocketIO(message_queue=url, json=json_codec)
+    start = time.perf_counter()
+    for _ in range(emits):
+        emitter.emit('push_notification', NOTIFICATION, to=ROOM)
+    for done in dones:
+        if not done.wait(WORKER_TIMEOUT):
+            raise RuntimeError('A worker did not receive every notification; is the queue shared?')
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.terminate()
+    return per_worker * workers * emits / elapsed
+
+def start_fake_redis():
+    """redis:// URL of a fakeredis server running in a child process"""
+    from fakeredis import TcpFakeServer
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    server = multiprocessing.Process(
+        target=lambda: TcpFakeServer(('127.0.0.1', port), server_type='redis').serve_forever(), daemon=True)
+    server.start()
+    time.sleep(0.5)
+    return f'redis://127.0.0.1:{port}/0'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--clients', type=int, default=500, help='clients in the room across all workers')
+    parser.add_argument('--emits', type=int, default=200)
+    parser.add_argument('--queue', default=os.environ.get('SOCKETIO_MESSAGE_QUEUE'))
+    parser.add_argument('--fake-redis', action='store_true', help='run against an in-process fakeredis server')
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method('fork')
+    queue = start_fake_redis() if args.fake_redis else args.queue
+    if not is_shared_queue(queue):
+        parser.error('--queue (or SOCKETIO_MESSAGE_QUEUE) must be a shared queue such as redis://localhost:6379/0, '
+                     'or pass --fake-redis')
+
+    print(f'queue: {queue}{" (fakeredis)" if args.fake_redis else ""}  clients: {args.clients}  emits: {args.emits}')
+    baseline = None
+    for workers in args.workers:
+        rate = run(queue, workers, args.clients, args.emits)
+        baseline = baseline or rate
+        print(f'{workers:>3} workers: {rate:>12,.0f} deliveries/s  ({rate / baseline:.2f}x)')
@@ -0,0 +1,72 @@
+"""Encode time for a 50-incident active board, stdlib json vs json_codec.
+
+    python bench_json.py [--incidents 50] [--iterations 500]
+"""
+import os
+import sys
+# Same layout as main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from src import json_codec
+
+def build_board(count):
+    now = datetime.utcnow()
+    board = []
+    for i in range(count):
+        created_at = now - timedelta(minutes=i)
+        board.append({
+            'id': i + 1,
+            'incident_type': 'Structure Fire',
+            'location': f'Location {i}',
+            'address': f'{100 + i} Main St, Dallas, TX',
+            'priority': 1 + i % 3,
+            'units_requested': 4,
+            'pertinent_details': 'Smoke showing from the second floor, occupants reported inside.',
+            'created_by': 'DISPATCH-1',
+            'created_at': created_at,
+            'status': 'active',
+            'timeline': [{
+                'id': n + 1,
+                'timestamp': created_at + timedelta(seconds=n * 30),
+                'type': 'note',
+                'content': f'Update {n}: crews operating, no change in conditions',
+                'user': f'FM-{n % 25 + 1}'
+            } for n in range(20)],
+            'responding_units': [{
+                'user_id': f'FM-{n + 1}',
+                'unit_number': f'E{n + 1}',
+                'status': 'on_scene',
+                'responded_at': created_at + timedelta(minutes=1),
+                'on_scene_at': created_at + timedelta(minutes=6),
+                'cleared_at': None
+            } for n in range(5)]
+        })
+    return board
+
+def stdlib_dumps(board):
+    # What Flask's default provider had to do: isoformat every datetime
+    return json.dumps(board, default=lambda value: value.isoformat(), separators=(',', ':'))
+
+def measure(label, encode, board, iterations):
+    encode(board)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        size = len(encode(board))
+    elapsed = (time.perf_counter() - start) / iterations
+    print(f'{label:<20} {elapsed * 1000:8.3f} ms/board  {size:>8} chars')
+    return elapsed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--incidents', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    board = build_board(args.incidents)
+    baseline = measure('json (stdlib)', stdlib_dumps, board, args.iterations)
+    fast = measure(f'json_codec ({json_codec.backend()})', json_codec.dumps, board, args.iterations)
+    print(f'speedup: {baseline / fast:.1f}x')
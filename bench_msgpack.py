@@ -0,0 +1,56 @@
+"""Socket.IO packet size and encode/decode time for a board, JSON vs MessagePack.
+
+    python bench_msgpack.py [--incidents 50] [--iterations 300]
+
+Sizes are shown raw and deflated, as a websocket with permessage-deflate
+would send them. The msgpack encode column is what the server pays per
+broadcast: decoding the JSON packet the client manager already built and
+re-encoding it as msgpack. Needs the optional msgpack package.
+"""
+import os
+import sys
+# Same layout as main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import time
+import zlib
+import msgpack
+from socketio import packet
+from src import json_codec
+from src.bench_json import build_board
+from src.serializers import to_msgpack
+
+def timed(function, iterations):
+    function()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = function()
+    return (time.perf_counter() - start) / iterations, result
+
+def report(label, encoded, encode_time, decode_time):
+    data = encoded.encode() if isinstance(encoded, str) else encoded
+    print(f'{label:<10} {len(data):>9} B  {len(zlib.compress(data)):>8} B deflated  '
+          f'encode {encode_time * 1000:7.3f} ms  decode {decode_time * 1000:7.3f} ms')
+    return len(data)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--incidents', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=300)
+    args = parser.parse_args()
+
+    packet.Packet.json = json_codec
+    board = build_board(args.incidents)
+    event = packet.Packet(packet.EVENT, data=['incident_sync', {'incidents': board}])
+
+    json_encode, json_text = timed(event.encode, args.iterations)
+    json_decode, _ = timed(lambda: packet.Packet(encoded_packet=json_text), args.iterations)
+    msgpack_encode, msgpack_bytes = timed(lambda: to_msgpack(packet.Packet(encoded_packet=json_text)),
+                                          args.iterations)
+    msgpack_decode, _ = timed(lambda: msgpack.loads(msgpack_bytes), args.iterations)
+
+    print(f'{args.incidents}-incident board, json_codec backend: {json_codec.backend()}')
+    json_size = report('json', json_text, json_encode, json_decode)
+    msgpack_size = report('msgpack', msgpack_bytes, json_encode + msgpack_encode, msgpack_decode)
+    print(f'msgpack is {msgpack_size / json_size:.0%} of the JSON size')
@@ -0,0 +1,84 @@
+"""Read throughput on the incident database while a writer is active.
+
+Compares the 'default' and 'production' SQLite profiles:
+
+    python bench_sqlite.py [--seconds 5] [--readers 8]
+"""
+import os
+import sys
+# Same layout as main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from src.sqlite_profile import SQLITE_PROFILES, SQLITE_POOL_OPTIONS, make_pragma_listener
+
+def run_profile(name, seconds, readers):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    pragmas = SQLITE_PROFILES[name]
+    connect_args = {'check_same_thread': False}
+    if 'busy_timeout' in pragmas:
+        connect_args['timeout'] = pragmas['busy_timeout'] / 1000
+    engine = create_engine(f'sqlite:///{path}', connect_args=connect_args, **SQLITE_POOL_OPTIONS)
+    if pragmas:
+        event.listen(engine, 'connect', make_pragma_listener(pragmas))
+
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE timeline_entry (id INTEGER PRIMARY KEY, incident_id INTEGER, content TEXT)'))
+        conn.execute(text('CREATE INDEX ix_timeline_entry_incident_id ON timeline_entry (incident_id)'))
+        conn.execute(text('INSERT INTO timeline_entry (incident_id, content) VALUES (:i, :c)'),
+                     [{'i': i % 50, 'c': 'x' * 200} for i in range(5000)])
+
+    stop = threading.Event()
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def writer():
+        while not stop.is_set():
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text('INSERT INTO timeline_entry (incident_id, content) VALUES (1, :c)'), {'c': 'note'})
+                with lock:
+                    counts['writes'] += 1
+            except OperationalError:
+                with lock:
+                    counts['locked'] += 1
+
+    def reader():
+        done = 0
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text('SELECT id, content FROM timeline_entry WHERE incident_id = :i'),
+                                 {'i': done % 50}).fetchall()
+                done += 1
+            except OperationalError:
+                with lock:
+                    counts['locked'] += 1
+        with lock:
+            counts['reads'] += done
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    print(f'{name:<12} reads/s={counts["reads"] / seconds:>10.0f}  '
+          f'writes/s={counts["writes"] / seconds:>8.0f}  locked_errors={counts["locked"]}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    args = parser.parse_args()
+
+    for profile in ('default', 'production'):
+        run_profile(profile, args.seconds, args.readers)
@@ -0,0 +1,98 @@
+from src.models.incident import Incident, SyncCounter
+from src.payload_cache import incident_payloads
+from datetime import datetime
+import threading
+
+class ActiveBoardCache:
+    """Write-through cache of active incident payloads.
+
+    Loaded from the database on first read, then kept current by the
+    mutation routes calling store() after each commit; storing a payload
+    that is no longer active drops the incident. Writes made by other
+    worker processes are caught on read: when the global change version
+    has moved past the one the cache last saw, only the incidents changed
+    since then are re-read.
+
+    Payloads are versioned, so a write that reaches store() after a newer
+    one for the same incident (or after a refresh that already read it) is
+    ignored rather than rolling the board back.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._incidents = {}
+        self._removed = {}  # Incident id -> version it left the board at, until a refresh covers it
+        self._loaded = False
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.stores = 0
+
+    def get_board(self):
+        """Active incidents in board order (priority, then oldest first)"""
+        # Read before loading, so a write racing the load is picked up again next time
+        version = SyncCounter.current_version()
+        with self._lock:
+            if not self._loaded:
+                self.misses += 1
+                # Loading under the lock makes any concurrent store() apply after the load
+                self._incidents = {incident.id: incident_payloads.get(incident)
+                                   for incident in Incident.active_board().all()}
+                self._removed = {}
+                self._loaded = True
+                self._version = version
+            elif version > self._version:
+                self.refreshes += 1
+                for incident in Incident.query.filter(Incident.change_version > self._version):
+                    if incident.status == 'active':
+                        self._incidents[incident.id] = incident_payloads.get(incident)
+                    else:
+                        self._incidents.pop(incident.id, None)
+                self._version = version
+                self._removed = {incident_id: removed for incident_id, removed in self._removed.items()
+                                 if removed > version}
+            else:
+                self.hits += 1
+            incidents = list(self._incidents.values())
+
+        incidents.sort(key=lambda payload: (payload.data['priority'], payload.data['created_at'] or datetime.min,
+                                            payload.incident_id))
+        return incidents
+
+    def store(self, payload):
+        """Write an incident payload through to the cache, unless the cache already has a newer one"""
+        with self._lock:
+            if not self._loaded or payload.version <= self._version:
+                return
+            current = self._incidents.get(payload.incident_id)
+            newest = current.version if current is not None else self._removed.get(payload.incident_id, 0)
+            if payload.version < newest:
+                return
+            if payload.data.get('status') == 'active':
+                self._incidents[payload.incident_id] = payload
+                self._removed.pop(payload.incident_id, None)
+                self.stores += 1
+            else:
+                self._removed[payload.incident_id] = payload.version
+                self._incidents.pop(payload.incident_id, None)
+
+    def invalidate(self):
+        """Drop everything; the next read reloads from the database"""
+        with self._lock:
+            self._incidents = {}
+            self._removed = {}
+            self._loaded = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self._loaded,
+                'size': len(self._incidents),
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'stores': self.stores
+            }
+
+active_board_cache = ActiveBoardCache()
@@ -0,0 +1,322 @@
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
+from src.models.incident import db, Incident, TimelineEntry, IncidentResponse, SyncCounter
+from src.middleware.auth import dispatch_or_admin_required, admin_required
+from src.routes.incidents import history_filters
+from src.json_codec import dumps, loads
+from src.board_cache import active_board_cache
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from src.archive import archive_cleared_incidents
+from src.models.analytics import record_transitions
+from datetime import datetime
+from types import SimpleNamespace
+import csv
+import io
+
+bulk_bp = Blueprint('bulk', __name__)
+
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_COLUMNS = [
+    'record_type', 'incident_id',
+    'incident_type', 'location', 'address', 'priority', 'units_requested', 'pertinent_details',
+    'created_by', 'created_at', 'status',
+    'entry_id', 'timestamp', 'entry_type', 'content', 'user',
+    'user_id', 'unit_number', 'unit_status', 'responded_at', 'on_scene_at', 'cleared_at'
+]
+
+def incident_record(incident):
+    return {
+        'record_type': 'incident',
+        'incident_id': incident.id,
+        'incident_type': incident.incident_type,
+        'location': incident.location,
+        'address': incident.address,
+        'priority': incident.priority,
+        'units_requested': incident.units_requested,
+        'pertinent_details': incident.pertinent_details,
+        'created_by': incident.created_by,
+        'created_at': incident.created_at,
+        'status': incident.status
+    }
+
+def timeline_record(entry):
+    return {
+        'record_type': 'timeline_entry',
+        'incident_id': entry.incident_id,
+        'entry_id': entry.seq,
+        'timestamp': entry.timestamp,
+        'entry_type': entry.entry_type,
+        'content': entry.content,
+        'user': entry.user
+    }
+
+def response_record(response):
+    return {
+        'record_type': 'unit_response',
+        'incident_id': response.incident_id,
+        'user_id': response.user_id,
+        'unit_number': response.unit_number,
+        'unit_status': response.status,
+        'responded_at': response.responded_at,
+        'on_scene_at': response.on_scene_at,
+        'cleared_at': response.cleared_at
+    }
+
+def iter_export_records(filters, batch_size=EXPORT_BATCH_SIZE):
+    """Yield flattened incident, timeline and unit response records in keyset batches.
+
+    Each batch is a fresh query that starts after the last (created_at, id)
+    seen, and the session is emptied between batches, so memory stays flat
+    no matter how many incidents match.
+    """
+    after = None
+    while True:
+        incidents = Incident.history(after=after, **filters).limit(batch_size).all()
+        if not incidents:
+            return
+
+        ids = [incident.id for incident in incidents]
+        entries = {}
+        for entry in TimelineEntry.query.filter(TimelineEntry.incident_id.in_(ids)).order_by(
+                TimelineEntry.incident_id, TimelineEntry.seq):
+            entries.setdefault(entry.incident_id, []).append(entry)
+        responses = {}
+        for response in IncidentResponse.query.filter(IncidentResponse.incident_id.in_(ids)).order_by(
+                IncidentResponse.incident_id, IncidentResponse.id):
+            responses.setdefault(response.incident_id, []).append(response)
+
+        for incident in incidents:
+            yield incident_record(incident)
+            for entry in entries.get(incident.id, []):
+                yield timeline_record(entry)
+            for response in responses.get(incident.id, []):
+                yield response_record(response)
+
+        after = (incidents[-1].created_at, incidents[-1].id)
+        db.session.expunge_all()
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def generate_ndjson(records):
+    for record in records:
+        yield dumps(record) + '\n'
+
+def generate_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for record in records:
+        writer.writerow({key: _csv_value(value) for key, value in record.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+@bulk_bp.route('/incidents/export', methods=['GET'])
+@dispatch_or_admin_required
+def export_incidents(current_user):
+    """Stream incident history as NDJSON or CSV (dispatch or admin only).
+
+    Accepts the same status, since, until, priority and incident_type
+    filters as GET /api/incidents; status defaults to all.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    try:
+        filters = history_filters(request.args, default_status='all')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    records = iter_export_records(filters)
+    if export_format == 'csv':
+        body, mimetype = generate_csv(records), 'text/csv'
+    else:
+        body, mimetype = generate_ndjson(records), 'application/x-ndjson'
+
+    response = current_app.response_class(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=incidents.{export_format}'
+    return response
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+def _parse_datetime(value, field):
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} is not an ISO 8601 timestamp')
+
+def _require(row, field, kind):
+    value = row.get(field)
+    if not isinstance(value, kind) or isinstance(value, bool) or value == '':
+        raise ValueError(f'{field} is required')
+    return value
+
+def validate_import_row(row):
+    """Turn one import row (Incident.to_dict() shape) into incident, timeline and unit response values.
+
+    Raises ValueError describing the first problem found.
+    """
+    if not isinstance(row, dict):
+        raise ValueError('row must be a JSON object')
+
+    priority = _require(row, 'priority', int)
+    if priority not in (1, 2, 3):
+        raise ValueError('priority must be 1, 2 or 3')
+    status = row.get('status') or 'cleared'
+    if status not in ('active', 'cleared'):
+        raise ValueError('status must be active or cleared')
+
+    created_at = _parse_datetime(row.get('created_at'), 'created_at') or datetime.utcnow()
+    incident = {
+        'incident_type': _require(row, 'incident_type', str),
+        'location': _require(row, 'location', str),
+        'address': _require(row, 'address', str),
+        'priority': priority,
+        'units_requested': row.get('units_requested') or 0,
+        'pertinent_details': row.get('pertinent_details') or '',
+        'created_by': row.get('created_by') or 'IMPORT',
+        'created_at': created_at,
+        'status': status,
+        'cleared_at': _parse_datetime(row.get('cleared_at'), 'cleared_at') if status == 'cleared' else None
+    }
+    if not isinstance(incident['units_requested'], int):
+        raise ValueError('units_requested must be an integer')
+
+    timeline = []
+    for seq, entry in enumerate(row.get('timeline') or [], 1):
+        if not isinstance(entry, dict) or not entry.get('type'):
+            raise ValueError(f'timeline entry {seq} needs a type')
+        timeline.append({
+            'seq': seq,
+            'timestamp': _parse_datetime(entry.get('timestamp'), f'timeline entry {seq} timestamp') or created_at,
+            'entry_type': entry['type'],
+            'content': entry.get('content'),
+            'user': entry.get('user')
+        })
+
+    responses = []
+    seen_units = set()
+    for unit in row.get('responding_units') or []:
+        if not isinstance(unit, dict) or not unit.get('user_id'):
+            raise ValueError('responding unit needs a user_id')
+        if unit['user_id'] in seen_units:
+            raise ValueError(f'responding unit {unit["user_id"]} listed twice')
+        seen_units.add(unit['user_id'])
+        responses.append({
+            'user_id': unit['user_id'],
+            'unit_number': unit.get('unit_number'),
+            'status': unit.get('status') or 'clear',
+            'responded_at': _parse_datetime(unit.get('responded_at'), 'responded_at') or created_at,
+            'on_scene_at': _parse_datetime(unit.get('on_scene_at'), 'on_scene_at'),
+            'cleared_at': _parse_datetime(unit.get('cleared_at'), 'cleared_at')
+        })
+
+    return incident, timeline, responses
+
+def _insert_batch(rows):
+    """Insert validated rows with one executemany per table, all stamped with one change version"""
+    version = SyncCounter.next_version(db.session.connection())
+    ids = db.session.scalars(
+        insert(Incident).returning(Incident.id, sort_by_parameter_order=True),
+        [dict(incident, change_version=version) for incident, _, _ in rows]
+    ).all()
+
+    entries = [dict(entry, incident_id=incident_id, change_version=version)
+               for incident_id, (_, timeline, _) in zip(ids, rows) for entry in timeline]
+    if entries:
+        db.session.execute(insert(TimelineEntry), entries)
+    responses = [dict(response, incident_id=incident_id, change_version=version)
+                 for incident_id, (_, _, unit_responses) in zip(ids, rows) for response in unit_responses]
+    if responses:
+        db.session.execute(insert(IncidentResponse), responses)
+        record_transitions(
+            (SimpleNamespace(**incident), SimpleNamespace(**response), status, response[f'{field}_at'])
+            for incident, _, unit_responses in rows for response in unit_responses
+            for status, field in (('responding', 'responded'), ('on_scene', 'on_scene'), ('clear', 'cleared'))
+            if response[f'{field}_at'] is not None
+        )
+
+def import_incidents(lines, batch_size=IMPORT_BATCH_SIZE):
+    """Import NDJSON incident rows in batched transactions.
+
+    Invalid rows are reported and skipped. If the database rejects a batch,
+    that batch is retried row by row so only the offending rows fail.
+    """
+    result = {'imported': 0, 'failed': 0, 'errors': []}
+
+    def fail(line_number, message):
+        result['failed'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'line': line_number, 'error': message})
+
+    def flush(batch):
+        try:
+            _insert_batch([row for _, row in batch])
+            db.session.commit()
+            result['imported'] += len(batch)
+        except SQLAlchemyError:
+            db.session.rollback()
+            for line_number, row in batch:
+                try:
+                    _insert_batch([row])
+                    db.session.commit()
+                    result['imported'] += 1
+                except SQLAlchemyError as e:
+                    db.session.rollback()
+                    fail(line_number, str(e.orig if getattr(e, 'orig', None) else e))
+
+    batch = []
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            batch.append((line_number, validate_import_row(loads(line))))
+        except ValueError as e:
+            fail(line_number, str(e))
+            continue
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    return result
+
+@bulk_bp.route('/incidents/import', methods=['POST'])
+@admin_required
+def import_incidents_route(current_user):
+    """Bulk import incidents from an NDJSON body (admin only).
+
+    Each line is one incident in the GET /api/incidents/<id> shape, with
+    optional timeline and responding_units. Rows are inserted in batches
+    without Socket.IO broadcasts or push notifications.
+    """
+    try:
+        result = import_incidents(request.stream)
+        if result['imported']:
+            active_board_cache.invalidate()
+        return jsonify(result)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bulk_bp.route('/archive', methods=['POST'])
+@admin_required
+def archive_incidents(current_user):
+    """Archive cleared incidents older than a number of days (admin only)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        older_than_days = int(data.get('older_than_days', current_app.config.get('ARCHIVE_AFTER_DAYS', 30)))
+        return jsonify({'archived': archive_cleared_incidents(older_than_days)})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
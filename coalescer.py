@@ -0,0 +1,103 @@
+import threading
+
+# Events that carry the incident's whole state, so a later one makes an earlier one redundant
+SUPERSEDING_EVENTS = ('incident_update', 'incident_created')
+
+class IncidentEventCoalescer:
+    """Per-incident buffer that turns bursts of broadcasts into one packet.
+
+    The first event for an incident opens a window; everything published for
+    that incident until it closes goes out together. A lone event is sent
+    unchanged, several are sent as one incident_batch event listing them in
+    order, with earlier full-state updates dropped in favour of later ones.
+    Urgent events (priority 1 creations) skip the window. A window of 0
+    sends everything immediately.
+    """
+
+    def __init__(self, window=0.075, room='general'):
+        self.window = window
+        self.room = room
+        self.socketio = None
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.received = 0
+        self.packets = 0
+        self.batches = 0
+        self.superseded = 0
+        self.bypassed = 0
+
+    def init_app(self, socketio, window=None):
+        self.socketio = socketio
+        if window is not None:
+            self.window = window
+
+    def publish(self, incident_id, event, data, urgent=False):
+        """Broadcast event for incident_id to the room, coalesced with others in the same window"""
+        with self._lock:
+            self.received += 1
+            if urgent or self.window <= 0 or incident_id is None:
+                self.bypassed += 1
+                # Anything already waiting for this incident goes first to keep the order
+                pending = self._pending.pop(incident_id, None)
+            else:
+                pending = self._pending.get(incident_id)
+                if pending is None:
+                    self._pending[incident_id] = [(event, data)]
+                    self.socketio.start_background_task(self._flush_later, incident_id)
+                else:
+                    pending.append((event, data))
+                return
+
+        if pending:
+            self._send(incident_id, pending)
+        self._send(incident_id, [(event, data)])
+
+    def flush(self, incident_id):
+        """Send whatever is waiting for incident_id now"""
+        with self._lock:
+            pending = self._pending.pop(incident_id, None)
+        if pending:
+            self._send(incident_id, pending)
+
+    def _flush_later(self, incident_id):
+        self.socketio.sleep(self.window)
+        self.flush(incident_id)
+
+    def _send(self, incident_id, events):
+        if len(events) > 1:
+            latest = {}
+            for index, (event, _) in enumerate(events):
+                if event in SUPERSEDING_EVENTS:
+                    latest[event] = index
+            kept = [(event, data) for index, (event, data) in enumerate(events)
+                    if event not in SUPERSEDING_EVENTS or latest[event] == index]
+            with self._lock:
+                self.superseded += len(events) - len(kept)
+            events = kept
+
+        with self._lock:
+            self.packets += 1
+            if len(events) > 1:
+                self.batches += 1
+        if len(events) == 1:
+            self.socketio.emit(events[0][0], events[0][1], room=self.room)
+        else:
+            self.socketio.emit('incident_batch', {
+                'incident_id': incident_id,
+                'events': [{'event': event, 'data': data} for event, data in events]
+            }, room=self.room)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'window_ms': round(self.window * 1000),
+                'pending_incidents': len(self._pending),
+                'received': self.received,
+                'packets': self.packets,
+                'batches': self.batches,
+                'merged': self.received - self.packets - sum(len(events) for events in self._pending.values()),
+                'superseded': self.superseded,
+                'bypassed': self.bypassed
+            }
+
+incident_events = IncidentEventCoalescer()
@@ -0,0 +1,119 @@
+from flask import request
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import mimetypes
+import os
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/css', 'text/plain',
+                          'application/javascript', 'text/javascript', 'image/svg+xml'}
+STATIC_EXTENSIONS = {'.js', '.css', '.html', '.svg', '.json', '.txt', '.map', '.ico'}
+
+# Suffix appended to a strong ETag for each encoded representation
+ETAG_SUFFIXES = {'br': '-br', 'gzip': '-gzip'}
+
+def supported_encodings():
+    return ['br', 'gzip'] if brotli else ['gzip']
+
+def negotiate_encoding():
+    """Best encoding the client accepts, preferring brotli"""
+    for encoding in supported_encodings():
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+def compress(data, encoding, static=False):
+    """Compress bytes; static assets get the slow maximum settings since it happens once"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if static else 4)
+    return gzip.compress(data, compresslevel=9 if static else 6)
+
+def etag_variants(etag):
+    """The plain ETag plus its per-encoding variants, for If-None-Match checks"""
+    return [etag] + [etag + suffix for suffix in ETAG_SUFFIXES.values()]
+
+def init_compression(app):
+    """Compress dynamic responses above COMPRESS_MIN_SIZE bytes for clients that accept it"""
+    min_size = app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        encoding = negotiate_encoding()
+        if encoding is None or len(data) < min_size:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(etag + ETAG_SUFFIXES[encoding], weak=weak)
+        return response
+
+class PrecompressedAssets:
+    """Compressed variants of static files, built once at startup.
+
+    Uses .br/.gz files from the build when they sit next to the asset,
+    otherwise compresses the asset in memory. Each variant is served with
+    the asset's content hash as its ETag, so clients can revalidate it.
+    """
+
+    def __init__(self, static_folder, min_size=1024):
+        self.variants = {}
+        self.etags = {}
+        self.modified = {}
+        if not static_folder or not os.path.isdir(static_folder):
+            return
+
+        for root, _, files in os.walk(static_folder):
+            for name in files:
+                if os.path.splitext(name)[1] not in STATIC_EXTENSIONS:
+                    continue
+                path = os.path.join(root, name)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                if len(data) < min_size:
+                    continue
+
+                relative = os.path.relpath(path, static_folder).replace(os.sep, '/')
+                self.variants[relative] = {
+                    encoding: self._load_variant(path, data, encoding) for encoding in supported_encodings()
+                }
+                self.etags[relative] = hashlib.sha1(data).hexdigest()
+                self.modified[relative] = datetime.fromtimestamp(int(os.path.getmtime(path)), timezone.utc)
+
+    @staticmethod
+    def _load_variant(path, data, encoding):
+        prebuilt = path + ('.br' if encoding == 'br' else '.gz')
+        if os.path.exists(prebuilt) and os.path.getmtime(prebuilt) >= os.path.getmtime(path):
+            with open(prebuilt, 'rb') as f:
+                return f.read()
+        return compress(data, encoding, static=True)
+
+    def response(self, app, path):
+        """Compressed response for path when a variant exists and the client accepts it, else None"""
+        variants = self.variants.get(path)
+        encoding = negotiate_encoding() if variants else None
+        if encoding is None:
+            return None
+
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response = app.response_class(variants[encoding], mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.set_etag(self.etags[path] + ETAG_SUFFIXES[encoding])
+        response.last_modified = self.modified[path]
+        return response.make_conditional(request)
@@ -0,0 +1,142 @@
+from src.models.user import db
+from src.models.incident import Incident, Unit
+from sqlalchemy.exc import OperationalError
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_SEARCH_RADIUS_KM = 500.0
+NEAREST_START_RADIUS_KM = 2.0
+
+# R-tree indexes over incident and unit positions, keyed by the owning row's
+# id and kept in sync by triggers, so ORM writes, bulk imports and archival
+# deletes all maintain them. Rows without coordinates are simply absent.
+GEO_DDL = [
+    'CREATE VIRTUAL TABLE IF NOT EXISTS incident_geo USING rtree(id, min_lat, max_lat, min_lon, max_lon)',
+    'CREATE VIRTUAL TABLE IF NOT EXISTS unit_geo USING rtree(id, min_lat, max_lat, min_lon, max_lon)'
+]
+for _table, _index in (('incident', 'incident_geo'), ('unit', 'unit_geo')):
+    GEO_DDL += [
+        f"""CREATE TRIGGER IF NOT EXISTS {_index}_ai AFTER INSERT ON {_table}
+        WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+            INSERT INTO {_index} VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {_index}_au AFTER UPDATE OF latitude, longitude ON {_table} BEGIN
+            DELETE FROM {_index} WHERE id = old.id;
+            INSERT INTO {_index} SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+            WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {_index}_ad AFTER DELETE ON {_table} BEGIN
+            DELETE FROM {_index} WHERE id = old.id;
+        END"""
+    ]
+
+GEO_BACKFILL = [
+    f"""INSERT INTO {index} SELECT id, latitude, latitude, longitude, longitude FROM {table}
+       WHERE latitude IS NOT NULL AND longitude IS NOT NULL"""
+    for table, index in (('incident', 'incident_geo'), ('unit', 'unit_geo'))
+]
+
+def create_geo_index():
+    """Create the R-tree indexes and their sync triggers, backfilling them the first time.
+
+    Returns False when this SQLite build lacks the R-tree module; proximity
+    queries are then unavailable.
+    """
+    with db.engine.begin() as connection:
+        exists = connection.execute(db.text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'incident_geo'"
+        )).first() is not None
+        try:
+            for statement in GEO_DDL:
+                connection.execute(db.text(statement))
+        except OperationalError:
+            return False
+        if not exists:
+            for statement in GEO_BACKFILL:
+                connection.execute(db.text(statement))
+    return True
+
+def parse_coordinates(latitude, longitude):
+    """Validate a latitude/longitude pair; both None clears a position. Raises ValueError."""
+    if latitude is None and longitude is None:
+        return None, None
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError('latitude and longitude must both be numbers')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('latitude must be within [-90, 90] and longitude within [-180, 180]')
+    return latitude, longitude
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing a circle; widens to all longitudes near the poles"""
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(latitude - delta_lat, -90.0), min(latitude + delta_lat, 90.0)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat < 1e-6:
+        return min_lat, max_lat, -180.0, 180.0
+    delta_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    return min_lat, max_lat, max(longitude - delta_lon, -180.0), min(longitude + delta_lon, 180.0)
+
+def _within(table, index, latitude, longitude, radius_km, criteria):
+    """(distance_km, id) of rows within radius_km matching criteria, nearest first.
+
+    The R-tree narrows candidates to the bounding box and the join applies
+    criteria and reads exact coordinates, all in one statement without
+    loading ORM objects. CROSS JOIN pins the R-tree as the outer loop;
+    otherwise SQLite prefers the status index and probes the R-tree per row.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    params = {'min_lat': min_lat, 'max_lat': max_lat, 'min_lon': min_lon, 'max_lon': max_lon}
+    where = ''
+    for column, value in criteria.items():
+        where += f' AND t.{column} = :{column}'
+        params[column] = value
+    rows = db.session.execute(db.text(
+        f"""SELECT t.id, t.latitude, t.longitude FROM {index} g CROSS JOIN {table} t ON t.id = g.id
+            WHERE g.max_lat >= :min_lat AND g.min_lat <= :max_lat
+              AND g.max_lon >= :min_lon AND g.min_lon <= :max_lon{where}"""
+    ), params)
+
+    hits = [(distance_km(latitude, longitude, lat, lon), row_id) for row_id, lat, lon in rows]
+    return sorted(hit for hit in hits if hit[0] <= radius_km)
+
+def _nearby(model, index, latitude, longitude, radius_km, limit, criteria):
+    """Rows of model near a point, nearest first, as (row, distance_km) pairs.
+
+    With a radius, everything inside it (up to limit). Without one, the
+    search box doubles from NEAREST_START_RADIUS_KM until limit rows match or
+    MAX_SEARCH_RADIUS_KM is reached, which gives k-nearest. Only the final
+    rows are loaded through the ORM.
+    """
+    radius = radius_km if radius_km is not None else NEAREST_START_RADIUS_KM
+    while True:
+        hits = _within(model.__tablename__, index, latitude, longitude, radius, criteria)[:limit]
+        if radius_km is not None or len(hits) >= limit or radius >= MAX_SEARCH_RADIUS_KM:
+            break
+        radius = min(radius * 2, MAX_SEARCH_RADIUS_KM)
+
+    if not hits:
+        return []
+    rows = {row.id: row for row in model.query.filter(model.id.in_([row_id for _, row_id in hits]))}
+    return [(rows[row_id], distance) for distance, row_id in hits if row_id in rows]
+
+def nearby_incidents(latitude, longitude, radius_km=None, limit=20, status='active'):
+    """Incidents near a point with their distance in km, nearest first"""
+    criteria = {} if status == 'all' else {'status': status}
+    return [{'incident': incident.to_summary_dict(), 'distance_km': round(distance, 3)}
+            for incident, distance in _nearby(Incident, 'incident_geo', latitude, longitude,
+                                              radius_km, limit, criteria)]
+
+def nearby_units(latitude, longitude, radius_km=None, limit=20, unit_type=None):
+    """Units with a known position near a point with their distance in km, nearest first"""
+    criteria = {'unit_type': unit_type} if unit_type else {}
+    return [{'unit': unit.to_dict(), 'distance_km': round(distance, 3)}
+            for unit, distance in _nearby(Unit, 'unit_geo', latitude, longitude,
+                                          radius_km, limit, criteria)]
@@ -1,6 +1,8 @@
 from src.models.user import db
+from sqlalchemy import event
+from src.json_codec import RawJSON, dumps, loads
 from datetime import datetime
-import json
+import zlib
 
 class Incident(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -13,13 +15,40 @@ class Incident(db.Model):
     created_by = db.Column(db.String(50), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(20), default='active')  # active, cleared
-    timeline = db.Column(db.Text)  # JSON string of timeline events
-    responding_units = db.Column(db.Text)  # JSON string of responding units
+    cleared_at = db.Column(db.DateTime)  # When status last became cleared; drives archival age
+    timeline = db.Column(db.Text)  # Legacy JSON blob, migrated into TimelineEntry rows
+    responding_units = db.Column(db.Text)  # Legacy JSON blob, migrated into IncidentResponse rows
+    change_version = db.Column(db.Integer, default=0, index=True)  # Bumped on any change to the incident or its children
+    row_version = db.Column(db.Integer, nullable=False, default=1)  # Optimistic lock, checked on every UPDATE
+    latitude = db.Column(db.Float)  # Optional WGS84 position, indexed in the incident_geo R-tree
+    longitude = db.Column(db.Float)
+
+    timeline_entries = db.relationship('TimelineEntry', backref='incident', lazy='dynamic',
+                                       order_by='TimelineEntry.seq')
+    responses = db.relationship('IncidentResponse', backref='incident', lazy='dynamic',
+                                order_by='IncidentResponse.id')
+
+    # Every UPDATE is a compare-and-swap on row_version; losing writers get StaleDataError
+    __mapper_args__ = {'version_id_col': row_version}
+
+    # Serves the active board: equality on status, then already sorted by priority and age
+    # History pages walk (created_at, id); id is the rowid, so it rides along in both indexes
+    __table_args__ = (
+        db.Index('ix_incident_status_priority_created_at', 'status', 'priority', 'created_at'),
+        db.Index('ix_incident_status_created_at', 'status', 'created_at'),
+        db.Index('ix_incident_created_at', 'created_at'),
+    )
 
     def __repr__(self):
         return f'<Incident {self.id}: {self.incident_type}>'
 
     def to_dict(self):
+        data = self._fields_dict()
+        data['timeline'] = [entry.to_dict() for entry in self.timeline_entries]
+        data['responding_units'] = [response.to_dict() for response in self.responses]
+        return data
+
+    def _fields_dict(self):
         return {
             'id': self.id,
             'incident_type': self.incident_type,
@@ -29,17 +58,299 @@ class Incident(db.Model):
             'units_requested': self.units_requested,
             'pertinent_details': self.pertinent_details,
             'created_by': self.created_by,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': self.created_at,
+            'status': self.status,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'change_version': self.change_version
+        }
+
+    def to_summary_dict(self):
+        """Incident fields without the timeline and responding units, for delta sync"""
+        return self._fields_dict()
+
+    def add_timeline_entry(self, entry_type, content, user, timestamp=None):
+        """Append a timeline entry as a single-row insert"""
+        return self.add_timeline_entries([(entry_type, content, user)], timestamp)[0]
+
+    def add_timeline_entries(self, entries, timestamp=None):
+        """Append (type, content, user) entries with one sequence lookup for the whole batch"""
+        timestamp = timestamp or datetime.utcnow()
+        first_seq = TimelineEntry.next_seq(self.id)
+        added = [TimelineEntry(
+            incident_id=self.id,
+            seq=first_seq + offset,
+            timestamp=timestamp,
+            entry_type=entry_type,
+            content=content,
+            user=user
+        ) for offset, (entry_type, content, user) in enumerate(entries)]
+        db.session.add_all(added)
+        return added
+
+    @classmethod
+    def active_board(cls):
+        """Active incidents, highest priority first, oldest first within a priority"""
+        return cls.query.filter_by(status='active').order_by(cls.priority, cls.created_at, cls.id)
+
+    @classmethod
+    def history(cls, status=None, since=None, until=None, priority=None, incident_type=None, after=None):
+        """Filtered incidents, newest first, starting after an optional (created_at, id) key"""
+        query = cls.query
+        if status:
+            query = query.filter(cls.status == status)
+        if since:
+            query = query.filter(cls.created_at >= since)
+        if until:
+            query = query.filter(cls.created_at < until)
+        if priority is not None:
+            query = query.filter(cls.priority == priority)
+        if incident_type:
+            query = query.filter(cls.incident_type == incident_type)
+        if after:
+            created_at, incident_id = after
+            query = query.filter(db.or_(
+                cls.created_at < created_at,
+                db.and_(cls.created_at == created_at, cls.id < incident_id)
+            ))
+        return query.order_by(cls.created_at.desc(), cls.id.desc())
+
+    def get_response(self, user_id):
+        """Look up a responding unit through the (incident_id, user_id) index"""
+        return IncidentResponse.query.filter_by(incident_id=self.id, user_id=user_id).first()
+
+    def get_responses(self, user_ids):
+        """Responding units for several user ids in one indexed query, keyed by user id"""
+        responses = IncidentResponse.query.filter(
+            IncidentResponse.incident_id == self.id,
+            IncidentResponse.user_id.in_(user_ids)
+        )
+        return {response.user_id: response for response in responses}
+
+class TimelineEntry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    incident_id = db.Column(db.Integer, db.ForeignKey('incident.id'), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)  # Per-incident entry number, exposed as 'id'
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    entry_type = db.Column(db.String(50), nullable=False)  # note, photo, resource_request, status_update
+    content = db.Column(db.Text)
+    user = db.Column(db.String(50))
+    change_version = db.Column(db.Integer, default=0, index=True)
+
+    # The unique index leads with incident_id, so it also serves per-incident lookups
+    __table_args__ = (
+        db.UniqueConstraint('incident_id', 'seq', name='uq_timeline_entry_incident_seq'),
+    )
+
+    def __repr__(self):
+        return f'<TimelineEntry {self.incident_id}#{self.seq}: {self.entry_type}>'
+
+    @staticmethod
+    def next_seq(incident_id):
+        """Next per-incident entry number, read from the (incident_id, seq) index"""
+        current = db.session.query(db.func.max(TimelineEntry.seq)).filter_by(incident_id=incident_id).scalar()
+        return (current or 0) + 1
+
+    def to_dict(self):
+        return {
+            'id': self.seq,
+            'timestamp': self.timestamp,
+            'type': self.entry_type,
+            'content': self.content,
+            'user': self.user
+        }
+
+class IncidentResponse(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    incident_id = db.Column(db.Integer, db.ForeignKey('incident.id'), nullable=False)
+    user_id = db.Column(db.String(20), nullable=False)  # FM-1, DISPATCH-1
+    unit_number = db.Column(db.String(50))
+    status = db.Column(db.String(20), default='responding')  # responding, on_scene, clear
+    responded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    on_scene_at = db.Column(db.DateTime)
+    cleared_at = db.Column(db.DateTime)
+    change_version = db.Column(db.Integer, default=0, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('incident_id', 'user_id', name='uq_incident_response_incident_user'),
+        db.Index('ix_incident_response_user_id', 'user_id'),
+    )
+
+    def __repr__(self):
+        return f'<IncidentResponse {self.user_id} -> {self.incident_id}: {self.status}>'
+
+    def set_status(self, status, timestamp=None):
+        """Move the unit to on_scene or clear, stamping the matching time"""
+        timestamp = timestamp or datetime.utcnow()
+        if status == 'on_scene':
+            self.status = 'on_scene'
+            self.on_scene_at = timestamp
+        elif status == 'clear':
+            self.status = 'clear'
+            self.cleared_at = timestamp
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'unit_number': self.unit_number,
             'status': self.status,
-            'timeline': json.loads(self.timeline) if self.timeline else [],
-            'responding_units': json.loads(self.responding_units) if self.responding_units else []
+            'responded_at': self.responded_at,
+            'on_scene_at': self.on_scene_at,
+            'cleared_at': self.cleared_at
+        }
+
+class ArchivedIncident(db.Model):
+    """Cleared incident moved out of the hot table, with its full serialized state zlib-compressed"""
+    __bind_key__ = 'archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Same id the incident had
+    incident_type = db.Column(db.String(100), nullable=False)
+    location = db.Column(db.String(200), nullable=False)
+    address = db.Column(db.String(300), nullable=False)
+    priority = db.Column(db.Integer, nullable=False)
+    created_by = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, index=True)
+    cleared_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    payload = db.Column(db.LargeBinary, nullable=False)  # zlib(JSON of Incident.to_dict())
+
+    def __repr__(self):
+        return f'<ArchivedIncident {self.id}: {self.incident_type}>'
+
+    @classmethod
+    def from_incident(cls, incident):
+        return cls(
+            id=incident.id,
+            incident_type=incident.incident_type,
+            location=incident.location,
+            address=incident.address,
+            priority=incident.priority,
+            created_by=incident.created_by,
+            created_at=incident.created_at,
+            cleared_at=incident.cleared_at,
+            payload=zlib.compress(dumps(incident.to_dict()).encode(), 9)
+        )
+
+    def to_summary_dict(self):
+        return {
+            'id': self.id,
+            'incident_type': self.incident_type,
+            'location': self.location,
+            'address': self.address,
+            'priority': self.priority,
+            'created_by': self.created_by,
+            'created_at': self.created_at,
+            'status': 'cleared',
+            'archived': True
         }
 
-    def set_timeline(self, timeline_data):
-        self.timeline = json.dumps(timeline_data)
+    def payload_json(self):
+        """The archived to_dict() as pre-encoded JSON text"""
+        return RawJSON(zlib.decompress(self.payload).decode())
+
+    def payload_dict(self):
+        """The archived to_dict(), decoded; timestamps stay ISO 8601 strings"""
+        return loads(zlib.decompress(self.payload))
+
+class SyncCounter(db.Model):
+    """Single-row global change counter stamped onto every incident mutation"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def current_version():
+        counter = db.session.get(SyncCounter, 1)
+        return counter.version if counter else 0
+
+    @staticmethod
+    def next_version(connection):
+        """Increment and return the counter inside the flushing transaction"""
+        table = SyncCounter.__table__
+        result = connection.execute(table.update().where(table.c.id == 1).values(version=table.c.version + 1))
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(id=1, version=1))
+        return connection.execute(db.select(table.c.version).where(table.c.id == 1)).scalar()
+
+class IncidentTombstone(db.Model):
+    """Record that an incident left the hot tables, so delta sync can tell clients to drop it"""
+    id = db.Column(db.Integer, primary_key=True)
+    incident_id = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(20), nullable=False)  # archived
+    removed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    change_version = db.Column(db.Integer, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<IncidentTombstone {self.incident_id}: {self.reason}>'
+
+    def to_dict(self):
+        return {'id': self.incident_id, 'reason': self.reason}
+
+CHANGES_PAGE_SIZE = 500
+
+def changes_since(version, limit=CHANGES_PAGE_SIZE):
+    """Incidents, timeline entries, unit responses and removals changed after the given version.
+
+    A page holds at most limit rows and always ends on a whole version, so
+    one flush is never split across pages. When more remains, 'more' is set
+    and 'version' is where the next page starts. A single version bigger
+    than a page (such as a bulk import) sets 'resync_required' instead:
+    the client should reload the full board and continue from 'version'.
+    """
+    current = SyncCounter.current_version()
+    # limit + 1 rows per kind are enough to find the last version that fits in the page
+    pages = [model.query.filter(model.change_version > version).order_by(model.change_version, model.id)
+             .limit(limit + 1).all() for model in (Incident, TimelineEntry, IncidentResponse, IncidentTombstone)]
+    changes = {'since': version, 'version': current, 'more': False, 'resync_required': False,
+               'incidents': [], 'timeline_entries': [], 'unit_responses': [], 'removed': []}
+
+    versions = sorted(row.change_version for rows in pages for row in rows)
+    if not versions:
+        return changes
+    if len(versions) <= limit:
+        until = max(current, versions[-1])
+    elif versions[limit] == versions[0]:
+        changes['resync_required'] = True
+        changes['version'] = max(current, versions[-1])
+        return changes
+    else:
+        until = versions[limit] - 1  # Every row at or below this version is in versions[:limit]
+        changes['more'] = True
+
+    incidents, entries, responses, tombstones = [[row for row in rows if row.change_version <= until]
+                                                 for rows in pages]
+    changes.update({
+        'version': until,
+        'incidents': [incident.to_summary_dict() for incident in incidents],
+        'timeline_entries': [dict(entry.to_dict(), incident_id=entry.incident_id) for entry in entries],
+        'unit_responses': [dict(response.to_dict(), incident_id=response.incident_id) for response in responses],
+        'removed': [tombstone.to_dict() for tombstone in tombstones]
+    })
+    return changes
+
+@event.listens_for(db.session, 'before_flush')
+def stamp_change_version(session, flush_context, instances):
+    """Stamp one new change version on every incident, timeline entry and unit response in the flush.
+
+    Call type changes have no row to stamp but still advance the counter,
+    so collection ETags built from it change with them.
+    """
+    changed = [obj for obj in session.new if isinstance(obj, (Incident, TimelineEntry, IncidentResponse))]
+    changed += [obj for obj in session.dirty
+                if isinstance(obj, (Incident, TimelineEntry, IncidentResponse)) and session.is_modified(obj)]
+    call_types_changed = any(isinstance(obj, CallType)
+                             for obj in list(session.new) + list(session.dirty) + list(session.deleted))
+    if not changed and not call_types_changed:
+        return
 
-    def set_responding_units(self, units_data):
-        self.responding_units = json.dumps(units_data)
+    version = SyncCounter.next_version(session.connection())
+    with session.no_autoflush:
+        for obj in changed:
+            obj.change_version = version
+            # Child changes also bump the parent so per-incident versions cover the whole aggregate
+            if not isinstance(obj, Incident):
+                parent = obj.incident or session.get(Incident, obj.incident_id)
+                if parent is not None:
+                    parent.change_version = version
 
 class CallType(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -57,7 +368,7 @@ class CallType(db.Model):
             'name': self.name,
             'default_priority': self.default_priority,
             'created_by': self.created_by,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 class Unit(db.Model):
@@ -68,6 +379,9 @@ class Unit(db.Model):
     password_hash = db.Column(db.String(128))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
+    latitude = db.Column(db.Float)  # Last reported WGS84 position, indexed in the unit_geo R-tree
+    longitude = db.Column(db.Float)
+    location_updated_at = db.Column(db.DateTime)
 
     def __repr__(self):
         return f'<Unit {self.unit_id}: {self.unit_name}>'
@@ -78,7 +392,10 @@ class Unit(db.Model):
             'unit_id': self.unit_id,
             'unit_name': self.unit_name,
             'unit_type': self.unit_type,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None
+            'created_at': self.created_at,
+            'last_login': self.last_login,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'location_updated_at': self.location_updated_at
         }
 
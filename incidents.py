@@ -1,9 +1,26 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_socketio import SocketIO
-from src.models.incident import db, Incident, CallType
+from src.models.incident import db, Incident, CallType, IncidentResponse, ArchivedIncident, SyncCounter, Unit, changes_since
 from src.middleware.auth import token_required, dispatch_or_admin_required, admin_required
+from src.board_cache import active_board_cache
+from src.payload_cache import incident_payloads
+from src.json_codec import dumps
+from src.compression import etag_variants
+from src.socketio_events import FIRE_MARSHAL_ROOM
+from src.coalescer import incident_events
+from src.json_patch import make_patch
+from src.models.search import search_incidents
+from src.models.geo import parse_coordinates, nearby_incidents, nearby_units
+from src.models.analytics import DIMENSIONS, METRICS, record_transition, record_transitions, response_time_rollups
 from datetime import datetime
+from functools import wraps
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+import base64
 import json
+import random
+import time
+import zlib
 
 incidents_bp = Blueprint('incidents', __name__)
 
@@ -11,13 +28,247 @@ def get_socketio():
     """Get the SocketIO instance from the current app"""
     return current_app.extensions.get('socketio')
 
+# Raised when another request changed the incident first: a stale row_version,
+# a colliding timeline seq or unit response, or SQLite refusing a write on an
+# outdated snapshot. Other integrity and operational errors are real failures.
+CONFLICT_ERRORS = (StaleDataError, IntegrityError, OperationalError)
+MAX_CONFLICT_RETRIES = 10
+
+# Unique constraints that only a concurrent writer can violate, by name and by
+# the column list SQLite reports instead of the name
+RACE_CONSTRAINTS = (
+    'uq_timeline_entry_incident_seq', 'timeline_entry.incident_id, timeline_entry.seq',
+    'uq_incident_response_incident_user', 'incident_response.incident_id, incident_response.user_id'
+)
+
+def is_lost_race(error):
+    """True when a CONFLICT_ERRORS exception means another writer got there first"""
+    if isinstance(error, IntegrityError):
+        return any(constraint in str(error.orig) for constraint in RACE_CONSTRAINTS)
+    if isinstance(error, OperationalError):
+        return 'locked' in str(error.orig)
+    return True
+
+def retry_on_conflict(f):
+    """Re-run a mutation route from scratch when its commit loses an optimistic-lock race.
+
+    Routes re-raise CONFLICT_ERRORS after rolling back; each retry re-reads
+    the incident, so concurrent writers all land without a global lock. A
+    violated constraint that no race can explain is a bad request (400).
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        for attempt in range(MAX_CONFLICT_RETRIES):
+            try:
+                return f(*args, **kwargs)
+            except CONFLICT_ERRORS as e:
+                db.session.rollback()
+                if not is_lost_race(e):
+                    status = 400 if isinstance(e, IntegrityError) else 500
+                    return jsonify({'error': str(e.orig)}), status
+                time.sleep(random.uniform(0, min(0.005 * 2 ** attempt, 0.25)))
+        return jsonify({'error': 'Incident was modified concurrently, please retry'}), 409
+    
+    return decorated
+
+def broadcast_patch(before, after):
+    """Broadcast the JSON Patch from one incident payload to the next.
+
+    Clients holding from_version apply the patch to reach version; any other
+    version means an update was missed, and the client refetches the
+    incident instead.
+    """
+    if get_socketio() and before.version != after.version:
+        incident_events.publish(after.incident_id, 'incident_patch', {
+            'incident_id': after.incident_id,
+            'from_version': before.version,
+            'version': after.version,
+            'patch': make_patch(before.data, after.data)
+        })
+
+def json_response(body, status=200):
+    """JSON response that splices memoized incident payloads in without re-encoding them"""
+    return current_app.response_class(dumps(body), status=status, mimetype='application/json')
+
+def conditional_response(etag, build_body):
+    """Return 304 when the client's If-None-Match matches etag, else the body from build_body().
+
+    build_body is only called on a miss, so unchanged resources skip ORM
+    hydration and JSON encoding entirely.
+    """
+    if any(request.if_none_match.contains(variant) for variant in etag_variants(etag)):
+        response = current_app.response_class(status=304)
+    else:
+        response = json_response(build_body())
+    response.set_etag(etag)
+    return response
+
+def collection_etag(name):
+    """Strong ETag for a collection read, from the global change version and query string"""
+    query_hash = zlib.crc32(request.query_string)
+    return f'{name}-{SyncCounter.current_version()}-{query_hash:08x}'
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+HISTORY_PARAMS = ('status', 'since', 'until', 'priority', 'incident_type', 'cursor', 'limit')
+
+def encode_cursor(incident):
+    """Opaque keyset cursor for the (created_at, id) position of an incident"""
+    key = json.dumps([incident.created_at.isoformat(), incident.id])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, incident_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(incident_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+def history_filters(args, default_status='active'):
+    """Incident.history() filter arguments from request args; raises ValueError on bad input"""
+    status = args.get('status', default_status)
+    since = args.get('since')
+    until = args.get('until')
+    priority = args.get('priority')
+    return {
+        'status': None if status == 'all' else status,
+        'since': datetime.fromisoformat(since) if since else None,
+        'until': datetime.fromisoformat(until) if until else None,
+        'priority': int(priority) if priority else None,
+        'incident_type': args.get('incident_type')
+    }
+
 @incidents_bp.route('/incidents', methods=['GET'])
 @token_required
 def get_incidents(current_user):
-    """Get all active incidents"""
+    """Get the active board, or a filtered page of incident history.
+
+    Without query parameters this returns every active incident ordered by
+    priority. Any of status (active, cleared, all), since, until, priority,
+    incident_type, cursor or limit switches to a keyset-paged history walk,
+    newest first, with the next page's cursor in the X-Next-Cursor header.
+    """
+    try:
+        if not any(param in request.args for param in HISTORY_PARAMS):
+            return conditional_response(collection_etag('incidents'), active_board_cache.get_board)
+
+        try:
+            cursor = request.args.get('cursor')
+            limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+            query = Incident.history(after=decode_cursor(cursor) if cursor else None,
+                                     **history_filters(request.args))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        page = {}
+
+        def build_page():
+            incidents = query.limit(limit + 1).all()
+            if len(incidents) > limit:
+                page['next_cursor'] = encode_cursor(incidents[limit - 1])
+            return [incident_payloads.get(incident) for incident in incidents[:limit]]
+
+        response = conditional_response(collection_etag('incidents'), build_page)
+        if page.get('next_cursor'):
+            response.headers['X-Next-Cursor'] = page['next_cursor']
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@incidents_bp.route('/incidents/search', methods=['GET'])
+@token_required
+def search(current_user):
+    """Full-text search over locations, addresses, details and timeline notes, best match first"""
     try:
-        incidents = Incident.query.filter_by(status='active').all()
-        return jsonify([incident.to_dict() for incident in incidents])
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'q is required'}), 400
+        limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_PAGE_SIZE)
+        return json_response(search_incidents(query, limit))
+    except OperationalError:
+        return jsonify({'error': 'Full-text search is not available on this database'}), 501
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def proximity_args(args):
+    """Point, optional radius and result limit for a proximity query; raises ValueError"""
+    latitude, longitude = parse_coordinates(args.get('lat'), args.get('lon'))
+    if latitude is None:
+        raise ValueError('lat and lon are required')
+    radius_km = args.get('radius_km')
+    if radius_km is not None:
+        radius_km = float(radius_km)
+        if radius_km <= 0:
+            raise ValueError('radius_km must be positive')
+    limit = min(max(int(args.get('limit', 20)), 1), MAX_PAGE_SIZE)
+    return latitude, longitude, radius_km, limit
+
+@incidents_bp.route('/incidents/nearby', methods=['GET'])
+@token_required
+def get_nearby_incidents(current_user):
+    """Incidents within radius_km of lat/lon, or the limit nearest without a radius.
+
+    status is active (default), cleared or all.
+    """
+    try:
+        try:
+            latitude, longitude, radius_km, limit = proximity_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        status = request.args.get('status', 'active')
+        return json_response(nearby_incidents(latitude, longitude, radius_km, limit, status))
+    except OperationalError:
+        return jsonify({'error': 'Proximity search is not available on this database'}), 501
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@incidents_bp.route('/units/nearby', methods=['GET'])
+@token_required
+def get_nearby_units(current_user):
+    """Units within radius_km of lat/lon, or the limit nearest without a radius, optionally by unit_type"""
+    try:
+        try:
+            latitude, longitude, radius_km, limit = proximity_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        unit_type = request.args.get('unit_type')
+        return json_response(nearby_units(latitude, longitude, radius_km, limit, unit_type))
+    except OperationalError:
+        return jsonify({'error': 'Proximity search is not available on this database'}), 501
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@incidents_bp.route('/units/<unit_id>/location', methods=['PUT'])
+@token_required
+def update_unit_location(current_user, unit_id):
+    """Report a unit's position; units may update their own, dispatch and admin any unit's"""
+    try:
+        if current_user['unit_id'] != unit_id and current_user['unit_type'] not in ('dispatch', 'admin'):
+            return jsonify({'error': 'Cannot update another unit\'s location'}), 403
+        unit = Unit.query.filter_by(unit_id=unit_id).first()
+        if unit is None:
+            return jsonify({'error': 'Unit not found'}), 404
+        data = request.get_json() or {}
+        try:
+            unit.latitude, unit.longitude = parse_coordinates(data.get('latitude'), data.get('longitude'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        unit.location_updated_at = datetime.utcnow()
+        db.session.commit()
+        return json_response(unit.to_dict())
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@incidents_bp.route('/changes', methods=['GET'])
+@token_required
+def get_changes(current_user):
+    """Get incidents, timeline entries, unit statuses and removals changed since a version, one page at a time"""
+    try:
+        since = request.args.get('since', 0, type=int)
+        return jsonify(changes_since(since))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -27,6 +278,10 @@ def create_incident(current_user):
     """Create a new incident (dispatch or admin only)"""
     try:
         data = request.get_json()
+        try:
+            latitude, longitude = parse_coordinates(data.get('latitude'), data.get('longitude'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         incident = Incident(
             incident_type=data['incident_type'],
@@ -35,21 +290,21 @@ def create_incident(current_user):
             priority=data['priority'],
             units_requested=data['units_requested'],
             pertinent_details=data.get('pertinent_details', ''),
-            created_by=current_user['unit_id']
+            created_by=current_user['unit_id'],
+            latitude=latitude,
+            longitude=longitude
         )
         
-        # Initialize empty timeline and responding units
-        incident.set_timeline([])
-        incident.set_responding_units([])
-        
         db.session.add(incident)
         db.session.commit()
         
+        payload = incident_payloads.get(incident)
+        active_board_cache.store(payload)
+        
         # Emit real-time update
         socketio = get_socketio()
         if socketio:
-            incident_data = incident.to_dict()
-            socketio.emit('incident_created', incident_data, room='general')
+            incident_events.publish(incident.id, 'incident_created', payload, urgent=incident.priority == 1)
             
             # Send push notifications to Fire Marshal units
             notification_data = {
@@ -59,11 +314,9 @@ def create_incident(current_user):
                 'incident_id': incident.id,
                 'priority': incident.priority
             }
-            
-            for i in range(1, 26):
-                socketio.emit('push_notification', notification_data, room=f'user_FM-{i}')
+            socketio.emit('push_notification', notification_data, room=FIRE_MARSHAL_ROOM)
         
-        return jsonify(incident.to_dict()), 201
+        return json_response(payload, 201)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -72,16 +325,28 @@ def create_incident(current_user):
 def get_incident(incident_id):
     """Get a specific incident"""
     try:
-        incident = Incident.query.get_or_404(incident_id)
-        return jsonify(incident.to_dict())
+        version = db.session.query(Incident.change_version).filter_by(id=incident_id).scalar()
+        if version is None:
+            # Archived incidents never change again, so their ETag is fixed
+            archived = db.session.get(ArchivedIncident, incident_id)
+            if archived is None:
+                return jsonify({'error': 'Incident not found'}), 404
+            return conditional_response(f'archived-{incident_id}', archived.payload_json)
+        return conditional_response(
+            f'incident-{incident_id}-{version}',
+            lambda: incident_payloads.peek(incident_id, version)
+            or incident_payloads.get(db.session.get(Incident, incident_id))
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @incidents_bp.route('/incidents/<int:incident_id>', methods=['PUT'])
+@retry_on_conflict
 def update_incident(incident_id):
     """Update an incident"""
     try:
         incident = Incident.query.get_or_404(incident_id)
+        before = incident_payloads.get(incident)
         data = request.get_json()
         
         # Update fields if provided
@@ -97,152 +362,303 @@ def update_incident(incident_id):
             incident.units_requested = data['units_requested']
         if 'pertinent_details' in data:
             incident.pertinent_details = data['pertinent_details']
+        if 'latitude' in data or 'longitude' in data:
+            try:
+                incident.latitude, incident.longitude = parse_coordinates(data.get('latitude'), data.get('longitude'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
         if 'status' in data:
+            if data['status'] == 'cleared' and incident.status != 'cleared':
+                incident.cleared_at = datetime.utcnow()
             incident.status = data['status']
         
         db.session.commit()
-        return jsonify(incident.to_dict())
+        payload = incident_payloads.get(incident)
+        active_board_cache.store(payload)
+        broadcast_patch(before, payload)
+        return json_response(payload)
+    except CONFLICT_ERRORS:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @incidents_bp.route('/incidents/<int:incident_id>', methods=['DELETE'])
+@retry_on_conflict
 def delete_incident(incident_id):
     """Delete/Clear an incident"""
     try:
         incident = Incident.query.get_or_404(incident_id)
+        before = incident_payloads.get(incident)
         incident.status = 'cleared'
+        incident.cleared_at = datetime.utcnow()
         db.session.commit()
+        payload = incident_payloads.get(incident)
+        active_board_cache.store(payload)
+        broadcast_patch(before, payload)
         return jsonify({'message': 'Incident cleared successfully'})
+    except CONFLICT_ERRORS:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @incidents_bp.route('/incidents/<int:incident_id>/timeline', methods=['POST'])
+@retry_on_conflict
 def add_timeline_entry(incident_id):
     """Add entry to incident timeline"""
     try:
         incident = Incident.query.get_or_404(incident_id)
+        before = incident_payloads.get(incident)
         data = request.get_json()
         
-        # Get current timeline
-        timeline = json.loads(incident.timeline) if incident.timeline else []
-        
         # Add new entry
-        new_entry = {
-            'id': len(timeline) + 1,
-            'timestamp': datetime.utcnow().isoformat(),
-            'type': data['type'],  # note, photo, resource_request, status_update
-            'content': data['content'],
-            'user': data['user']
-        }
-        
-        timeline.append(new_entry)
-        incident.set_timeline(timeline)
+        incident.add_timeline_entry(
+            data['type'],  # note, photo, resource_request, status_update
+            data['content'],
+            data['user']
+        )
         
         db.session.commit()
-        return jsonify(incident.to_dict())
+        payload = incident_payloads.get(incident)
+        active_board_cache.store(payload)
+        broadcast_patch(before, payload)
+        return json_response(payload)
+    except CONFLICT_ERRORS:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def responding_entry_text(user_id, unit_number):
+    return f'{user_id} ({unit_number}) responding to call'
+
+def status_entry_text(user_id, status):
+    status_text = 'on scene' if status == 'on_scene' else 'cleared from call'
+    return f'{user_id} marked {status_text}'
+
 @incidents_bp.route('/incidents/<int:incident_id>/respond', methods=['POST'])
+@retry_on_conflict
 def respond_to_incident(incident_id):
     """Add responding unit to incident"""
     try:
         incident = Incident.query.get_or_404(incident_id)
+        before = incident_payloads.get(incident)
         data = request.get_json()
         
-        # Get current responding units
-        responding_units = json.loads(incident.responding_units) if incident.responding_units else []
-        
-        # Add new responding unit
-        new_unit = {
-            'user_id': data['user_id'],
-            'unit_number': data['unit_number'],
-            'status': 'responding',
-            'responded_at': datetime.utcnow().isoformat(),
-            'on_scene_at': None,
-            'cleared_at': None
-        }
-        
         # Check if unit already responding
-        existing_unit = next((unit for unit in responding_units if unit['user_id'] == data['user_id']), None)
-        if existing_unit:
+        if incident.get_response(data['user_id']):
             return jsonify({'error': 'Unit already responding to this incident'}), 400
         
-        responding_units.append(new_unit)
-        incident.set_responding_units(responding_units)
+        # Add new responding unit
+        now = datetime.utcnow()
+        response = IncidentResponse(
+            incident_id=incident.id,
+            user_id=data['user_id'],
+            unit_number=data['unit_number'],
+            status='responding',
+            responded_at=now
+        )
+        db.session.add(response)
+        record_transition(incident, response, 'responding', now)
         
         # Add timeline entry
-        timeline = json.loads(incident.timeline) if incident.timeline else []
-        timeline.append({
-            'id': len(timeline) + 1,
-            'timestamp': datetime.utcnow().isoformat(),
-            'type': 'status_update',
-            'content': f'{data["user_id"]} ({data["unit_number"]}) responding to call',
-            'user': data['user_id']
-        })
-        incident.set_timeline(timeline)
+        incident.add_timeline_entry('status_update', responding_entry_text(data['user_id'], data['unit_number']),
+                                    data['user_id'])
         
         db.session.commit()
-        return jsonify(incident.to_dict())
+        payload = incident_payloads.get(incident)
+        active_board_cache.store(payload)
+        broadcast_patch(before, payload)
+        return json_response(payload)
+    except CONFLICT_ERRORS:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @incidents_bp.route('/incidents/<int:incident_id>/status', methods=['PATCH'])
+@retry_on_conflict
 def update_unit_status(incident_id):
     """Update unit status (on scene, clear)"""
     try:
         incident = Incident.query.get_or_404(incident_id)
+        before = incident_payloads.get(incident)
         data = request.get_json()
         
-        # Get current responding units
-        responding_units = json.loads(incident.responding_units) if incident.responding_units else []
-        
         # Find and update unit status
-        unit_found = False
-        for unit in responding_units:
-            if unit['user_id'] == data['user_id']:
-                unit_found = True
-                if data['status'] == 'on_scene':
-                    unit['status'] = 'on_scene'
-                    unit['on_scene_at'] = datetime.utcnow().isoformat()
-                elif data['status'] == 'clear':
-                    unit['status'] = 'clear'
-                    unit['cleared_at'] = datetime.utcnow().isoformat()
-                break
-        
-        if not unit_found:
+        response = incident.get_response(data['user_id'])
+        if not response:
             return jsonify({'error': 'Unit not found in responding units'}), 404
         
-        incident.set_responding_units(responding_units)
+        now = datetime.utcnow()
+        if data['status'] in ('on_scene', 'clear') and response.status != data['status']:
+            record_transition(incident, response, data['status'], now)
+        response.set_status(data['status'], now)
         
         # Add timeline entry
-        timeline = json.loads(incident.timeline) if incident.timeline else []
-        status_text = 'on scene' if data['status'] == 'on_scene' else 'cleared from call'
-        timeline.append({
-            'id': len(timeline) + 1,
-            'timestamp': datetime.utcnow().isoformat(),
-            'type': 'status_update',
-            'content': f'{data["user_id"]} marked {status_text}',
-            'user': data['user_id']
-        })
-        incident.set_timeline(timeline)
+        incident.add_timeline_entry('status_update', status_entry_text(data['user_id'], data['status']), data['user_id'])
+        
+        db.session.commit()
+        payload = incident_payloads.get(incident)
+        active_board_cache.store(payload)
+        broadcast_patch(before, payload)
+        return json_response(payload)
+    except CONFLICT_ERRORS:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@incidents_bp.route('/incidents/<int:incident_id>/units', methods=['POST'])
+@dispatch_or_admin_required
+@retry_on_conflict
+def dispatch_units(current_user, incident_id):
+    """Assign units and change unit statuses on one incident in a single transaction.
+
+    Body: {"units": [{"user_id": "FM-1", "unit_number": "E1", "status": "responding"}, ...]}
+    where status is responding, on_scene or clear. Every item is checked
+    before anything is written; any invalid item rejects the whole batch.
+    The whole batch is broadcast as one incident_patch.
+    """
+    try:
+        incident = Incident.query.get_or_404(incident_id)
+        before = incident_payloads.get(incident)
+        data = request.get_json(silent=True)
+        units = data.get('units') if isinstance(data, dict) else None
+        if not units or not isinstance(units, list):
+            return jsonify({'error': 'units must be a non-empty list'}), 400
+        if not all(isinstance(unit, dict) for unit in units):
+            return jsonify({'error': 'No units were updated', 'errors': [
+                {'index': index, 'error': 'unit must be an object'}
+                for index, unit in enumerate(units) if not isinstance(unit, dict)
+            ]}), 400
+        
+        existing = incident.get_responses([unit.get('user_id') for unit in units
+                                           if isinstance(unit.get('user_id'), str)])
+        errors = []
+        seen = set()
+        for index, unit in enumerate(units):
+            user_id, status = unit.get('user_id'), unit.get('status', 'responding')
+            if not isinstance(user_id, str) or not user_id or user_id in seen:
+                errors.append({'index': index, 'error': 'user_id missing or repeated'})
+            elif not isinstance(unit.get('unit_number', ''), (str, type(None))):
+                errors.append({'index': index, 'error': 'unit_number must be a string'})
+            elif status not in ('responding', 'on_scene', 'clear'):
+                errors.append({'index': index, 'error': f'Unknown status {status}'})
+            elif status == 'responding' and user_id in existing:
+                errors.append({'index': index, 'error': 'Unit already responding to this incident'})
+            elif status != 'responding' and user_id not in existing:
+                errors.append({'index': index, 'error': 'Unit not found in responding units'})
+            if isinstance(user_id, str):
+                seen.add(user_id)
+        if errors:
+            return jsonify({'error': 'No units were updated', 'errors': errors}), 400
         
+        now = datetime.utcnow()
+        entries = []
+        transitions = []
+        for unit in units:
+            user_id, status = unit['user_id'], unit.get('status', 'responding')
+            if status == 'responding':
+                existing[user_id] = IncidentResponse(
+                    incident_id=incident.id,
+                    user_id=user_id,
+                    unit_number=unit.get('unit_number'),
+                    status='responding',
+                    responded_at=now
+                )
+                db.session.add(existing[user_id])
+                transitions.append((incident, existing[user_id], status, now))
+                entries.append(('status_update', responding_entry_text(user_id, unit.get('unit_number')), user_id))
+            else:
+                if existing[user_id].status != status:
+                    transitions.append((incident, existing[user_id], status, now))
+                existing[user_id].set_status(status, now)
+                entries.append(('status_update', status_entry_text(user_id, status), user_id))
+        
+        incident.add_timeline_entries(entries, now)
+        record_transitions(transitions)
         db.session.commit()
-        return jsonify(incident.to_dict())
+        
+        payload = incident_payloads.get(incident)
+        active_board_cache.store(payload)
+        broadcast_patch(before, payload)
+        
+        return json_response(payload)
+    except CONFLICT_ERRORS:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@incidents_bp.route('/units/<unit_id>/incidents', methods=['GET'])
+@token_required
+def get_unit_incidents(current_user, unit_id):
+    """Get active incidents a unit is responding to"""
+    try:
+        return conditional_response(
+            collection_etag(f'unit-{unit_id}-incidents'),
+            lambda: [incident_payloads.get(incident) for incident in Incident.query.join(IncidentResponse).filter(
+                IncidentResponse.user_id == unit_id,
+                Incident.status == 'active'
+            ).all()]
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@incidents_bp.route('/analytics/response-times', methods=['GET'])
+@dispatch_or_admin_required
+def get_response_time_analytics(current_user):
+    """Response-time rollups per unit, call type or hour (dispatch or admin only).
+
+    dimension is unit, call_type (default) or hour; key and metric (turnout,
+    travel, response, on_scene) narrow the result, and since/until bound
+    hours. Each row has count, mean, min, max and p50/p90/p95 in seconds.
+    """
+    try:
+        dimension = request.args.get('dimension', 'call_type')
+        metric = request.args.get('metric')
+        if dimension not in DIMENSIONS:
+            return jsonify({'error': f'dimension must be one of {", ".join(DIMENSIONS)}'}), 400
+        if metric is not None and metric not in METRICS:
+            return jsonify({'error': f'metric must be one of {", ".join(METRICS)}'}), 400
+        try:
+            since, until = request.args.get('since'), request.args.get('until')
+            since = datetime.fromisoformat(since) if since else None
+            until = datetime.fromisoformat(until) if until else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return json_response(response_time_rollups(dimension, request.args.get('key'), metric, since, until))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@incidents_bp.route('/board-cache/stats', methods=['GET'])
+@admin_required
+def get_board_cache_stats(current_user):
+    """Get active board and payload cache hit/miss counters (admin only)"""
+    return jsonify(dict(active_board_cache.stats(), payloads=incident_payloads.stats()))
+
+@incidents_bp.route('/broadcasts/stats', methods=['GET'])
+@admin_required
+def get_broadcast_stats(current_user):
+    """Get incident broadcast coalescing counters (admin only)"""
+    return jsonify(incident_events.stats())
+
 @incidents_bp.route('/call-types', methods=['GET'])
 def get_call_types():
     """Get all call types"""
     try:
-        call_types = CallType.query.all()
-        return jsonify([call_type.to_dict() for call_type in call_types])
+        return conditional_response(
+            collection_etag('call-types'),
+            lambda: [call_type.to_dict() for call_type in CallType.query.all()]
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
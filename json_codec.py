@@ -0,0 +1,83 @@
+from datetime import date, datetime
+from flask.json.provider import JSONProvider
+import json
+import re
+import secrets
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+class RawJSON:
+    """Already-encoded JSON text, spliced verbatim into any document that contains it"""
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+# The nonce is drawn per dumps() call, so a string in the document can never pass for a placeholder
+_PLACEHOLDER = '\x00rawjson:{}:{}\x00'
+_PLACEHOLDER_PATTERN = re.compile(r'"\\u0000rawjson:([0-9a-f]{16}):(\d+)\\u0000"')
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+_ORJSON_FRAGMENT = getattr(orjson, 'Fragment', None)
+
+def backend():
+    """Name of the encoder in use"""
+    return 'orjson' if orjson else 'json'
+
+def dumps(obj, **kwargs):
+    """Encode obj as compact JSON text.
+
+    Uses orjson when it is installed, stdlib json otherwise. Both encode
+    datetimes as ISO 8601 and splice RawJSON fragments in verbatim. Only
+    separators and default are honoured on the orjson path; any other
+    formatting option falls back to stdlib json.
+    """
+    if isinstance(obj, RawJSON):
+        return obj.text
+
+    fragments = []
+    nonce = None
+    fallback = kwargs.pop('default', None)
+    separators = kwargs.pop('separators', (',', ':'))
+    use_orjson = orjson is not None and not kwargs and separators == (',', ':')
+
+    def default(value):
+        nonlocal nonce
+        if isinstance(value, RawJSON):
+            if use_orjson and _ORJSON_FRAGMENT is not None:
+                return _ORJSON_FRAGMENT(value.text)
+            if nonce is None:
+                nonce = secrets.token_hex(8)
+            fragments.append(value.text)
+            return _PLACEHOLDER.format(nonce, len(fragments) - 1)
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if fallback is not None:
+            return fallback(value)
+        raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+    if use_orjson:
+        text = orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS).decode()
+    else:
+        text = json.dumps(obj, default=default, separators=separators, **kwargs)
+
+    if fragments:
+        text = _PLACEHOLDER_PATTERN.sub(lambda match: fragments[int(match.group(2))] if match.group(1) == nonce
+                                        else match.group(0), text)
+    return text
+
+def loads(s, **kwargs):
+    if orjson is not None and not kwargs:
+        return orjson.loads(s)
+    return json.loads(s, **kwargs)
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by json_codec, so jsonify() shares the Socket.IO encoder"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return loads(s, **kwargs)
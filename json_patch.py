@@ -0,0 +1,75 @@
+def _escape(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+def _unescape(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+def _identical(old, new):
+    """Equal and of the same JSON types throughout, so True/1 and 1/1.0 count as changes"""
+    if type(old) is not type(new):
+        return False
+    if isinstance(old, dict):
+        return old.keys() == new.keys() and all(_identical(value, new[key]) for key, value in old.items())
+    if isinstance(old, list):
+        return len(old) == len(new) and all(_identical(a, b) for a, b in zip(old, new))
+    return old == new
+
+def make_patch(old, new, path=''):
+    """RFC 6902 JSON Patch operations that turn old into new.
+
+    Only add, remove and replace are produced. Lists are compared position
+    by position, which suits the append-only timeline and responding units:
+    new entries become "add" operations at "/-".
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations = []
+        for key, value in old.items():
+            if key not in new:
+                operations.append({'op': 'remove', 'path': f'{path}/{_escape(key)}'})
+            elif not _identical(value, new[key]):
+                operations += make_patch(value, new[key], f'{path}/{_escape(key)}')
+        for key, value in new.items():
+            if key not in old:
+                operations.append({'op': 'add', 'path': f'{path}/{_escape(key)}', 'value': value})
+        return operations
+
+    if isinstance(old, list) and isinstance(new, list):
+        operations = []
+        for index in range(min(len(old), len(new))):
+            if not _identical(old[index], new[index]):
+                operations += make_patch(old[index], new[index], f'{path}/{index}')
+        for value in new[len(old):]:
+            operations.append({'op': 'add', 'path': f'{path}/-', 'value': value})
+        # Remove from the end so earlier indexes stay valid
+        for index in range(len(old) - 1, len(new) - 1, -1):
+            operations.append({'op': 'remove', 'path': f'{path}/{index}'})
+        return operations
+
+    if _identical(old, new):
+        return []
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+def apply_patch(document, operations):
+    """Apply add, remove and replace operations to document in place and return it"""
+    for operation in operations:
+        tokens = [_unescape(token) for token in operation['path'].split('/')[1:]]
+        if not tokens:
+            document = operation.get('value')
+            continue
+
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            if operation['op'] == 'add':
+                parent.insert(len(parent) if last == '-' else int(last), operation['value'])
+            elif operation['op'] == 'remove':
+                del parent[int(last)]
+            else:
+                parent[int(last)] = operation['value']
+        elif operation['op'] == 'remove':
+            del parent[last]
+        else:
+            parent[last] = operation['value']
+    return document
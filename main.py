@@ -3,24 +3,51 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from flask_socketio import SocketIO
 from src.models.user import db
 from src.models.incident import Incident, CallType, Unit
+from src.models.migrations import upgrade_database
+from src.archive import archive_cleared_incidents
+from src.models.analytics import rebuild_response_rollups
 from src.routes.user import user_bp
 from src.routes.incidents import incidents_bp
 from src.routes.auth import auth_bp
+from src.routes.bulk import bulk_bp
 from src.socketio_events import register_socketio_events
+from src.sqlite_profile import init_db_engine
+from src import json_codec
+from src.json_codec import FastJSONProvider
+from src.compression import init_compression, PrecompressedAssets
+from src.static_assets import StaticAssetIndex
+from src.realtime import is_shared_queue
+from src.coalescer import incident_events
+from src.serializers import enable_msgpack_negotiation
+import click
+import importlib.util
+import subprocess
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+app.json = FastJSONProvider(app)
 
-# Enable CORS for all routes
-CORS(app, origins="*")
+# Enable CORS for all routes; the SPA reads the history cursor and ETags from cross-origin responses
+CORS(app, origins="*", expose_headers=['X-Next-Cursor', 'ETag'])
+
+# Compress API responses; index and precompress the SPA bundle once
+init_compression(app)
+static_assets = StaticAssetIndex(app.static_folder, PrecompressedAssets(app.static_folder))
 
 # Initialize Socket.IO
-socketio = SocketIO(app, cors_allowed_origins="*", logger=True, engineio_logger=True)
+# Same encoder as the REST responses; it also emits memoized incident payloads without re-encoding.
+# With SOCKETIO_MESSAGE_QUEUE set (e.g. redis://localhost:6379/0), rooms and emits are shared
+# with every other worker on the same queue; the queue reuses the server's json codec.
+message_queue = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+socketio = SocketIO(app, cors_allowed_origins="*", logger=True, engineio_logger=True, json=json_codec,
+                    message_queue=message_queue)
+# Clients connecting with ?serializer=msgpack get MessagePack packets instead of JSON text
+enable_msgpack_negotiation(socketio.server)
 
 # Register Socket.IO events
 register_socketio_events(socketio)
@@ -29,11 +56,20 @@ register_socketio_events(socketio)
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(incidents_bp, url_prefix='/api')
 app.register_blueprint(auth_bp, url_prefix='/api')
+app.register_blueprint(bulk_bp, url_prefix='/api')
 
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
+app.config['SQLALCHEMY_BINDS'] = {
+    'archive': os.environ.get('ARCHIVE_DATABASE_URI',
+                              f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'archive.db')}")
+}
+app.config['ARCHIVE_AFTER_DAYS'] = int(os.environ.get('ARCHIVE_AFTER_DAYS', 30))
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'production')
+app.config['BROADCAST_COALESCE_MS'] = int(os.environ.get('BROADCAST_COALESCE_MS', 75))
+incident_events.init_app(socketio, app.config['BROADCAST_COALESCE_MS'] / 1000)
+init_db_engine(app, db)
 
 def initialize_default_data():
     """Initialize default units and call types"""
@@ -94,9 +130,60 @@ def initialize_default_data():
     
     db.session.commit()
 
-with app.app_context():
-    db.create_all()
-    initialize_default_data()
+# serve-workers runs this once before starting workers, which then skip it
+if os.environ.get('SKIP_DB_UPGRADE') != '1':
+    with app.app_context():
+        upgrade_database()
+        initialize_default_data()
+
+@app.cli.command('archive-incidents')
+def archive_incidents_command():
+    """Move cleared incidents older than ARCHIVE_AFTER_DAYS into the archive database"""
+    count = archive_cleared_incidents(app.config['ARCHIVE_AFTER_DAYS'])
+    print(f'Archived {count} incidents')
+
+@app.cli.command('rebuild-analytics')
+def rebuild_analytics_command():
+    """Recompute the response-time rollups from every unit response on record"""
+    rebuild_response_rollups()
+    print('Response-time rollups rebuilt')
+
+@app.cli.command('serve-workers')
+@click.option('--workers', '-w', default=2, show_default=True, help='Number of worker processes')
+@click.option('--host', default='0.0.0.0', show_default=True)
+@click.option('--base-port', default=5000, show_default=True, help='Worker i listens on base-port + i')
+def serve_workers_command(workers, host, base_port):
+    """Run one gunicorn gevent Socket.IO server per port, sharing rooms through SOCKETIO_MESSAGE_QUEUE.
+
+    Each worker gets its own port so a proxy can pin every client to one
+    worker (sticky sessions, e.g. nginx ip_hash), which Engine.IO polling
+    requires; for the same reason each gunicorn runs a single worker. The
+    database is upgraded once here, before any worker starts.
+    """
+    if workers > 1 and not is_shared_queue(message_queue):
+        raise click.UsageError('Multiple workers need SOCKETIO_MESSAGE_QUEUE set to a shared queue, '
+                               'e.g. redis://localhost:6379/0')
+    missing = [package for package in ('gunicorn', 'gevent') if importlib.util.find_spec(package) is None]
+    if missing:
+        raise click.UsageError(f'serve-workers needs {" and ".join(missing)}: pip install gunicorn gevent')
+
+    processes = []
+    for index in range(workers):
+        env = dict(os.environ, SKIP_DB_UPGRADE='1')
+        # Set by the flask command; it would make Flask-SocketIO fall back to threading mode
+        env.pop('FLASK_RUN_FROM_CLI', None)
+        processes.append(subprocess.Popen([
+            sys.executable, '-m', 'gunicorn', '--worker-class', 'gevent', '--workers', '1',
+            '--bind', f'{host}:{base_port + index}', '--chdir', os.path.dirname(os.path.abspath(__file__)),
+            'main:app'
+        ], env=env))
+        print(f'Worker {index} listening on {host}:{base_port + index}')
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
 
 # Socket.IO event handlers
 @socketio.on('connect')
@@ -124,18 +211,13 @@ def handle_incident_update(data):
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+    if app.static_folder is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    response = static_assets.response(app, path)
+    if response is None:
+        return "index.html not found", 404
+    return response
 
 
 if __name__ == '__main__':
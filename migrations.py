@@ -0,0 +1,108 @@
+from src.models.user import db
+from src.models.incident import Incident, TimelineEntry, IncidentResponse, ArchivedIncident
+from src.models.search import create_search_index, create_archive_search_index
+from src.models.geo import create_geo_index
+from src.models.analytics import ResponseMetric, rebuild_response_rollups
+from datetime import datetime
+import json
+
+def _parse_timestamp(value):
+    return datetime.fromisoformat(value) if value else None
+
+def add_missing_columns():
+    """Add model columns that db.create_all() skips on tables that already exist"""
+    inspector = db.inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                default = ''
+                if column.default is not None and column.default.is_scalar:
+                    default = f' DEFAULT {column.default.arg!r}'
+                connection.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}{default}'))
+
+def create_missing_indexes():
+    """Create model indexes that db.create_all() skips on tables that already exist"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+def migrate_timeline_blobs(batch_size=500):
+    """Move legacy Incident.timeline JSON blobs into TimelineEntry rows.
+
+    Each blob is cleared once its entries are inserted, so the migration is
+    safe to run on every startup.
+    """
+    migrated = 0
+    while True:
+        incidents = Incident.query.filter(Incident.timeline.isnot(None)).limit(batch_size).all()
+        if not incidents:
+            break
+
+        for incident in incidents:
+            for entry in json.loads(incident.timeline or '[]'):
+                db.session.add(TimelineEntry(
+                    incident_id=incident.id,
+                    seq=entry.get('id'),
+                    timestamp=_parse_timestamp(entry.get('timestamp')),
+                    entry_type=entry.get('type'),
+                    content=entry.get('content'),
+                    user=entry.get('user')
+                ))
+            incident.timeline = None
+            migrated += 1
+
+        db.session.commit()
+
+    return migrated
+
+def migrate_responding_unit_blobs(batch_size=500):
+    """Move legacy Incident.responding_units JSON blobs into IncidentResponse rows"""
+    migrated = 0
+    while True:
+        incidents = Incident.query.filter(Incident.responding_units.isnot(None)).limit(batch_size).all()
+        if not incidents:
+            break
+
+        for incident in incidents:
+            seen = set()
+            for unit in json.loads(incident.responding_units or '[]'):
+                if unit.get('user_id') in seen:
+                    continue
+                seen.add(unit.get('user_id'))
+                db.session.add(IncidentResponse(
+                    incident_id=incident.id,
+                    user_id=unit.get('user_id'),
+                    unit_number=unit.get('unit_number'),
+                    status=unit.get('status'),
+                    responded_at=_parse_timestamp(unit.get('responded_at')),
+                    on_scene_at=_parse_timestamp(unit.get('on_scene_at')),
+                    cleared_at=_parse_timestamp(unit.get('cleared_at'))
+                ))
+            incident.responding_units = None
+            migrated += 1
+
+        db.session.commit()
+
+    return migrated
+
+def upgrade_database():
+    """Bring an existing database up to the current models; safe to run on every startup"""
+    db.create_all()
+    add_missing_columns()
+    create_missing_indexes()
+    migrate_timeline_blobs()
+    migrate_responding_unit_blobs()
+    if ResponseMetric.query.first() is None and (IncidentResponse.query.first() is not None
+                                                 or ArchivedIncident.query.first() is not None):
+        rebuild_response_rollups()
+    if db.engine.dialect.name == 'sqlite':
+        create_search_index()
+        create_geo_index()
+    create_archive_search_index()
@@ -0,0 +1,63 @@
+from collections import OrderedDict
+from src.json_codec import RawJSON, dumps
+import threading
+
+class IncidentPayload(RawJSON):
+    """An incident's serialized state, encoded to JSON at most once"""
+    __slots__ = ('incident_id', 'version', 'data', '_text')
+
+    def __init__(self, incident_id, version, data):
+        self.incident_id = incident_id
+        self.version = version
+        self.data = data
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = dumps(self.data)
+        return self._text
+
+class IncidentPayloadCache:
+    """Bounded LRU of incident payloads keyed by (incident id, change_version).
+
+    A new change_version is a new key, so entries never need invalidating;
+    stale versions simply age out.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._payloads = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, incident_id, version):
+        """Cached payload for a known version, without touching the database"""
+        with self._lock:
+            payload = self._payloads.get((incident_id, version))
+            if payload is not None:
+                self._payloads.move_to_end((incident_id, version))
+                self.hits += 1
+            return payload
+
+    def get(self, incident):
+        """Payload for an incident row, serializing it on a miss"""
+        key = (incident.id, incident.change_version)
+        payload = self.peek(*key)
+        if payload is not None:
+            return payload
+
+        payload = IncidentPayload(incident.id, incident.change_version, incident.to_dict())
+        with self._lock:
+            self.misses += 1
+            self._payloads[key] = payload
+            while len(self._payloads) > self.maxsize:
+                self._payloads.popitem(last=False)
+        return payload
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._payloads), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+incident_payloads = IncidentPayloadCache()
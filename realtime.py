@@ -0,0 +1,6 @@
+# Kombu's in-memory transport only reaches servers in the same process
+LOCAL_QUEUE_PREFIXES = ('memory://',)
+
+def is_shared_queue(url):
+    """True when the queue can reach other processes, which multiple workers require"""
+    return bool(url) and not url.startswith(LOCAL_QUEUE_PREFIXES)
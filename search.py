@@ -0,0 +1,191 @@
+from src.models.user import db
+from src.models.incident import Incident, ArchivedIncident
+from sqlalchemy.exc import OperationalError
+import re
+
+# One FTS5 document per incident (rowid = -incident.id) and one per timeline
+# entry (rowid = timeline_entry.id). Appending a note is then a single
+# document insert instead of re-indexing the whole incident, and field
+# edits update the incident document by rowid. Deleting either row (as the
+# archive job does) deletes its document, so a reused timeline_entry id
+# never collides with a leftover one; archived incidents are searched in
+# the archive's own index instead.
+SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS incident_search USING fts5(
+        location, address, pertinent_details, content, incident_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS incident_search_ai AFTER INSERT ON incident BEGIN
+        INSERT INTO incident_search(rowid, location, address, pertinent_details, content, incident_id)
+        VALUES (-new.id, new.location, new.address, new.pertinent_details, new.incident_type, new.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS incident_search_au
+    AFTER UPDATE OF incident_type, location, address, pertinent_details ON incident BEGIN
+        UPDATE incident_search SET location = new.location, address = new.address,
+            pertinent_details = new.pertinent_details, content = new.incident_type
+        WHERE rowid = -new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS incident_search_ad AFTER DELETE ON incident BEGIN
+        DELETE FROM incident_search WHERE rowid = -old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS timeline_entry_search_ai AFTER INSERT ON timeline_entry BEGIN
+        INSERT INTO incident_search(rowid, content, incident_id) VALUES (new.id, new.content, new.incident_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS timeline_entry_search_ad AFTER DELETE ON timeline_entry BEGIN
+        DELETE FROM incident_search WHERE rowid = old.id;
+    END"""
+]
+
+# Documents left behind by archive runs from before the delete triggers existed
+SEARCH_PURGE = [
+    """DELETE FROM incident_search WHERE rowid < 0 AND -rowid NOT IN (SELECT id FROM incident)""",
+    """DELETE FROM incident_search WHERE rowid > 0 AND rowid NOT IN (SELECT id FROM timeline_entry)"""
+]
+
+SEARCH_BACKFILL = [
+    """INSERT INTO incident_search(rowid, location, address, pertinent_details, content, incident_id)
+       SELECT -id, location, address, pertinent_details, incident_type, id FROM incident""",
+    """INSERT INTO incident_search(rowid, content, incident_id)
+       SELECT id, content, incident_id FROM timeline_entry"""
+]
+
+def create_search_index():
+    """Create the FTS5 index and its sync triggers, backfilling it the first time.
+
+    Returns False when this SQLite build lacks FTS5; search is then unavailable.
+    """
+    with db.engine.begin() as connection:
+        exists = connection.execute(db.text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'incident_search'"
+        )).first() is not None
+        try:
+            for statement in SEARCH_DDL:
+                connection.execute(db.text(statement))
+        except OperationalError:
+            return False
+        for statement in SEARCH_PURGE if exists else SEARCH_BACKFILL:
+            connection.execute(db.text(statement))
+    return True
+
+# Archived incidents are immutable, so the archive keeps one document per
+# incident (rowid = incident id) holding its notes, written by the archive job
+ARCHIVE_SEARCH_DDL = """CREATE VIRTUAL TABLE IF NOT EXISTS archived_incident_search USING fts5(
+    location, address, pertinent_details, content,
+    tokenize = 'unicode61 remove_diacritics 2'
+)"""
+
+def _archive_execute(statement, params=None):
+    return db.session.execute(db.text(statement), params, bind_arguments={'mapper': ArchivedIncident})
+
+def archive_search_available():
+    engine = db.engines['archive']
+    if engine.dialect.name != 'sqlite':
+        return False
+    return _archive_execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'archived_incident_search'"
+    ).first() is not None
+
+def index_archived_incidents(archived):
+    """Add archived incidents to the archive's search index within the current transaction"""
+    if not archived or not archive_search_available():
+        return
+    documents = []
+    for incident in archived:
+        data = incident.payload_dict()
+        notes = [entry.get('content') or '' for entry in data.get('timeline') or []]
+        documents.append({'id': incident.id, 'location': data['location'], 'address': data['address'],
+                          'pertinent_details': data.get('pertinent_details'),
+                          'content': '\n'.join([data['incident_type']] + notes)})
+    # A re-run after an interrupted archive pass indexes the same incident again
+    _archive_execute('DELETE FROM archived_incident_search WHERE rowid = :id', [{'id': d['id']} for d in documents])
+    _archive_execute("""INSERT INTO archived_incident_search(rowid, location, address, pertinent_details, content)
+                        VALUES (:id, :location, :address, :pertinent_details, :content)""", documents)
+
+def create_archive_search_index(batch_size=200):
+    """Create the archive's FTS5 index, backfilling it from archived payloads the first time.
+
+    Returns False when the archive is not SQLite or lacks FTS5; archived
+    incidents are then left out of search.
+    """
+    if db.engines['archive'].dialect.name != 'sqlite':
+        return False
+    if archive_search_available():
+        return True
+    try:
+        _archive_execute(ARCHIVE_SEARCH_DDL)
+    except OperationalError:
+        db.session.rollback()
+        return False
+
+    last_id = 0
+    while True:
+        archived = ArchivedIncident.query.filter(ArchivedIncident.id > last_id).order_by(
+            ArchivedIncident.id).limit(batch_size).all()
+        if not archived:
+            break
+        index_archived_incidents(archived)
+        last_id = archived[-1].id
+    db.session.commit()
+    return True
+
+def build_match_query(text):
+    """Free text to a safe FTS5 query: every word must match, the last one as a prefix"""
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def search_archived(match, limit, exclude=()):
+    """(archived incident, snippet, rank) for the best-ranked archived incidents matching an FTS5 query"""
+    if limit <= 0 or not archive_search_available():
+        return []
+    rows = _archive_execute(
+        """SELECT rowid, snippet(archived_incident_search, -1, '[', ']', '...', 12) AS snippet, rank
+           FROM archived_incident_search WHERE archived_incident_search MATCH :match ORDER BY rank LIMIT :fetch""",
+        {'match': match, 'fetch': limit + len(exclude)}
+    ).all()
+    # An interrupted archive run can leave an incident in both places; the hot row wins
+    rows = [row for row in rows if row[0] not in exclude][:limit]
+    archived = {incident.id: incident for incident in
+                ArchivedIncident.query.filter(ArchivedIncident.id.in_([row[0] for row in rows]))}
+    return [(archived[incident_id], snippet, rank) for incident_id, snippet, rank in rows if incident_id in archived]
+
+def search_incidents(text, limit=20):
+    """Best-ranked incidents for text, each with a highlighted snippet from its best matching document.
+
+    Archived incidents, ranked within their own index, follow the live ones when there is room.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+
+    # Several documents can match per incident, so over-fetch and keep each incident's best
+    rows = db.session.execute(db.text(
+        """SELECT incident_id, snippet(incident_search, -1, '[', ']', '...', 12) AS snippet, rank
+           FROM incident_search WHERE incident_search MATCH :match ORDER BY rank LIMIT :fetch"""
+    ), {'match': match, 'fetch': limit * 5}).all()
+
+    best = {}
+    for incident_id, snippet, rank in rows:
+        if incident_id not in best:
+            best[incident_id] = (snippet, rank)
+        if len(best) == limit:
+            break
+
+    ids = list(best)
+    incidents = {incident.id: incident.to_summary_dict()
+                 for incident in Incident.query.filter(Incident.id.in_(ids))}
+    results = [{
+        'incident': incidents[incident_id],
+        'snippet': best[incident_id][0],
+        'score': -best[incident_id][1]
+    } for incident_id in ids if incident_id in incidents]
+
+    results += [{
+        'incident': archived.to_summary_dict(),
+        'snippet': snippet,
+        'score': -rank
+    } for archived, snippet, rank in search_archived(match, limit - len(results), incidents)]
+    return results
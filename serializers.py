@@ -0,0 +1,129 @@
+from socketio import packet
+from engineio import packet as eio_packet
+from urllib.parse import parse_qs
+
+try:
+    from socketio.msgpack_packet import MsgPackPacket
+except ImportError:  # pragma: no cover - msgpack is optional
+    MsgPackPacket = None
+
+SERIALIZER_PARAM = 'serializer'
+
+# python-socketio has no per-client serializer hook, so these server internals
+# are wrapped instead; requirements.txt pins the versions they are tested on
+SERVER_HOOKS = ('_handle_eio_connect', '_handle_eio_disconnect', '_handle_eio_message', '_send_packet',
+                '_send_eio_packet', '_handle_connect', '_handle_disconnect', '_handle_event', '_handle_ack')
+
+def to_msgpack(pkt):
+    """The same Socket.IO packet in the socket.io-msgpack-parser encoding"""
+    packet_type = {packet.BINARY_EVENT: packet.EVENT, packet.BINARY_ACK: packet.ACK}.get(pkt.packet_type,
+                                                                                         pkt.packet_type)
+    return MsgPackPacket(packet_type, data=pkt.data, namespace=pkt.namespace or '/', id=pkt.id).encode()
+
+class MessagePackNegotiation:
+    """Per-client MessagePack for a Socket.IO server that otherwise speaks JSON.
+
+    A client opts in by connecting with ?serializer=msgpack and using the
+    socket.io-msgpack-parser; everyone else is untouched. Emits are still
+    encoded once as JSON text by the client manager; the first msgpack
+    recipient of a packet converts it and the rest reuse that conversion,
+    so a broadcast costs one extra encode however many msgpack clients
+    there are. Without the msgpack package, msgpack connections are refused
+    so the client can fall back to JSON.
+    """
+
+    def __init__(self, server):
+        missing = [hook for hook in SERVER_HOOKS if not hasattr(server, hook)]
+        if missing:
+            raise RuntimeError(f'MessagePack negotiation does not support this python-socketio version '
+                               f'(missing {", ".join(missing)})')
+        self.server = server
+        self.clients = set()
+        self._converted = (None, None)
+        self._pending_binary = {}
+        self._handle_eio_connect = server._handle_eio_connect
+        self._handle_eio_disconnect = server._handle_eio_disconnect
+        self._handle_eio_message = server._handle_eio_message
+        self._send_packet = server._send_packet
+        self._send_eio_packet = server._send_eio_packet
+
+        server._handle_eio_connect = self.handle_eio_connect
+        server._handle_eio_disconnect = self.handle_eio_disconnect
+        server._handle_eio_message = self.handle_eio_message
+        server._send_packet = self.send_packet
+        server._send_eio_packet = self.send_eio_packet
+        # Engine.IO calls the handlers it was given at startup, not the attributes
+        server.eio.on('connect', self.handle_eio_connect)
+        server.eio.on('message', self.handle_eio_message)
+        server.eio.on('disconnect', self.handle_eio_disconnect)
+
+    def handle_eio_connect(self, eio_sid, environ):
+        query = parse_qs(environ.get('QUERY_STRING', ''))
+        if query.get(SERIALIZER_PARAM, ['json'])[0] == 'msgpack':
+            if MsgPackPacket is None:
+                return False
+            self.clients.add(eio_sid)
+        return self._handle_eio_connect(eio_sid, environ)
+
+    def handle_eio_disconnect(self, eio_sid, reason=None):
+        try:
+            if reason is None:
+                return self._handle_eio_disconnect(eio_sid)
+            return self._handle_eio_disconnect(eio_sid, reason)
+        finally:
+            self.clients.discard(eio_sid)
+            self._pending_binary.pop(eio_sid, None)
+
+    def handle_eio_message(self, eio_sid, data):
+        if eio_sid not in self.clients:
+            return self._handle_eio_message(eio_sid, data)
+
+        server = self.server
+        pkt = MsgPackPacket(encoded_packet=data)
+        if pkt.packet_type == packet.CONNECT:
+            server._handle_connect(eio_sid, pkt.namespace, pkt.data)
+        elif pkt.packet_type == packet.DISCONNECT:
+            server._handle_disconnect(eio_sid, pkt.namespace, server.reason.CLIENT_DISCONNECT)
+        elif pkt.packet_type == packet.EVENT:
+            server._handle_event(eio_sid, pkt.namespace, pkt.id, pkt.data)
+        elif pkt.packet_type == packet.ACK:
+            server._handle_ack(eio_sid, pkt.namespace, pkt.id, pkt.data)
+        else:
+            raise ValueError('Unknown packet type.')
+
+    def send_packet(self, eio_sid, pkt):
+        if eio_sid not in self.clients:
+            return self._send_packet(eio_sid, pkt)
+        self.server.eio.send(eio_sid, to_msgpack(pkt))
+
+    def send_eio_packet(self, eio_sid, eio_pkt):
+        if eio_sid not in self.clients:
+            return self._send_eio_packet(eio_sid, eio_pkt)
+
+        converted_from, converted = self._converted
+        if converted_from is not eio_pkt:
+            converted = self._convert(eio_sid, eio_pkt)
+            if converted is None:
+                return
+            if not eio_pkt.binary:
+                # Binary events are reassembled per recipient, so only plain packets are shared
+                self._converted = (eio_pkt, converted)
+        self.server.eio.send_packet(eio_sid, converted)
+
+    def _convert(self, eio_sid, eio_pkt):
+        """msgpack Engine.IO packet for a JSON one; None while a binary packet still awaits attachments"""
+        if eio_pkt.binary:
+            pkt = self._pending_binary[eio_sid]
+            if not pkt.add_attachment(eio_pkt.data):
+                return None
+            del self._pending_binary[eio_sid]
+        else:
+            pkt = self.server.packet_class(encoded_packet=eio_pkt.data)
+            if pkt.attachment_count:
+                self._pending_binary[eio_sid] = pkt
+                return None
+        return eio_packet.Packet(eio_packet.MESSAGE, to_msgpack(pkt))
+
+def enable_msgpack_negotiation(server):
+    """Let clients of a socketio.Server opt in to MessagePack one connection at a time"""
+    return MessagePackNegotiation(server)
@@ -1,7 +1,20 @@
 from flask_socketio import emit, join_room, leave_room
-from src.models.incident import db, Incident
+from src.models.incident import db, Unit, changes_since
+from src.board_cache import active_board_cache
+from src.coalescer import incident_events
 import json
 
+FIRE_MARSHAL_ROOM = 'role_fire_marshal'
+DISPATCH_ROOM = 'role_dispatch'
+
+def role_room(unit_type):
+    """Room shared by every connected unit of a type, so one emit reaches the whole role"""
+    return f'role_{unit_type}'
+
+def unit_role_room(user_id):
+    unit_type = db.session.query(Unit.unit_type).filter_by(unit_id=user_id).scalar()
+    return role_room(unit_type) if unit_type else None
+
 def register_socketio_events(socketio):
     """Register all Socket.IO event handlers"""
     
@@ -16,10 +29,13 @@ def register_socketio_events(socketio):
     
     @socketio.on('join_user_room')
     def handle_join_user_room(data):
-        """Join user-specific room for targeted notifications"""
+        """Join user-specific room for targeted notifications, plus the room for the unit's role"""
         user_id = data.get('user_id')
         if user_id:
             join_room(f'user_{user_id}')
+            room = unit_role_room(user_id)
+            if room:
+                join_room(room)
             print(f'User {user_id} joined their room')
     
     @socketio.on('join_general_room')
@@ -30,17 +46,20 @@ def register_socketio_events(socketio):
     
     @socketio.on('leave_user_room')
     def handle_leave_user_room(data):
-        """Leave user-specific room"""
+        """Leave user-specific room and role room"""
         user_id = data.get('user_id')
         if user_id:
             leave_room(f'user_{user_id}')
+            room = unit_role_room(user_id)
+            if room:
+                leave_room(room)
             print(f'User {user_id} left their room')
     
     @socketio.on('incident_created')
     def handle_incident_created(data):
         """Broadcast new incident to all users"""
         print(f'Broadcasting new incident: {data.get("incident_id")}')
-        emit('new_incident', data, room='general')
+        incident_events.publish(data.get('incident_id'), 'new_incident', data, urgent=data.get('priority') == 1)
         
         # Send push notification to all Fire Marshal units
         fire_marshal_notification = {
@@ -51,15 +70,13 @@ def register_socketio_events(socketio):
             'priority': data.get('priority')
         }
         
-        # Emit to all Fire Marshal users (FM-1 through FM-25)
-        for i in range(1, 26):
-            emit('push_notification', fire_marshal_notification, room=f'user_FM-{i}')
+        emit('push_notification', fire_marshal_notification, room=FIRE_MARSHAL_ROOM)
     
     @socketio.on('incident_updated')
     def handle_incident_updated(data):
         """Broadcast incident updates to all users"""
         print(f'Broadcasting incident update: {data.get("incident_id")}')
-        emit('incident_update', data, room='general')
+        incident_events.publish(data.get('incident_id'), 'incident_update', data)
     
     @socketio.on('unit_responded')
     def handle_unit_responded(data):
@@ -75,7 +92,7 @@ def register_socketio_events(socketio):
             'unit_number': data.get('unit_number')
         }
         
-        emit('unit_response', response_notification, room='general')
+        incident_events.publish(data.get('incident_id'), 'unit_response', response_notification)
         
         # Send specific notification to dispatch units
         dispatch_notification = {
@@ -85,8 +102,7 @@ def register_socketio_events(socketio):
             'incident_id': data.get('incident_id')
         }
         
-        for i in range(1, 6):
-            emit('push_notification', dispatch_notification, room=f'user_DISPATCH-{i}')
+        emit('push_notification', dispatch_notification, room=DISPATCH_ROOM)
     
     @socketio.on('status_updated')
     def handle_status_updated(data):
@@ -106,7 +122,7 @@ def register_socketio_events(socketio):
             'status': data.get('status')
         }
         
-        emit('status_update', status_notification, room='general')
+        incident_events.publish(data.get('incident_id'), 'status_update', status_notification)
     
     @socketio.on('timeline_updated')
     def handle_timeline_updated(data):
@@ -120,7 +136,7 @@ def register_socketio_events(socketio):
             'user_id': data.get('user_id')
         }
         
-        emit('timeline_update', timeline_notification, room='general')
+        incident_events.publish(data.get('incident_id'), 'timeline_update', timeline_notification)
         
         # If it's a resource request, notify dispatch
         if data.get('entry', {}).get('type') == 'resource_request':
@@ -131,8 +147,7 @@ def register_socketio_events(socketio):
                 'incident_id': data.get('incident_id')
             }
             
-            for i in range(1, 6):
-                emit('push_notification', resource_notification, room=f'user_DISPATCH-{i}')
+            emit('push_notification', resource_notification, room=DISPATCH_ROOM)
     
     @socketio.on('call_type_updated')
     def handle_call_type_updated(data):
@@ -166,12 +181,19 @@ def register_socketio_events(socketio):
     def handle_request_incident_sync():
         """Send current incidents to requesting client"""
         try:
-            incidents = Incident.query.filter_by(status='active').all()
-            incidents_data = [incident.to_dict() for incident in incidents]
-            emit('incident_sync', {'incidents': incidents_data})
+            emit('incident_sync', {'incidents': active_board_cache.get_board()})
         except Exception as e:
             emit('error', {'message': f'Failed to sync incidents: {str(e)}'})
     
+    @socketio.on('request_changes')
+    def handle_request_changes(data=None):
+        """Send only what changed since the client's last known version"""
+        try:
+            since = int((data or {}).get('since', 0))
+            emit('incident_changes', changes_since(since))
+        except Exception as e:
+            emit('error', {'message': f'Failed to sync changes: {str(e)}'})
+    
     @socketio.on('ping')
     def handle_ping():
         """Handle ping for connection testing"""
@@ -185,3 +207,7 @@ def send_push_notification(socketio, user_id, notification_data):
     """Helper function to send push notification to specific user"""
     socketio.emit('push_notification', notification_data, room=f'user_{user_id}')
 
+def send_role_notification(socketio, unit_type, notification_data):
+    """Helper function to send push notification to every unit of a type with one emit"""
+    socketio.emit('push_notification', notification_data, room=role_room(unit_type))
+
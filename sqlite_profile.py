@@ -0,0 +1,82 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+import os
+
+# PRAGMAs applied to every new SQLite connection. busy_timeout is in
+# milliseconds, cache_size is in KiB when negative, mmap_size is in bytes.
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'busy_timeout': 5000,
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON'
+    }
+}
+
+# Per-process pool: readers share connections across Socket.IO and REST handlers
+SQLITE_POOL_OPTIONS = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_timeout': 10,
+    'pool_pre_ping': False
+}
+
+def get_sqlite_pragmas(app):
+    """Resolve the PRAGMA set from SQLITE_PROFILE plus any SQLITE_PRAGMAS overrides"""
+    profile = app.config.get('SQLITE_PROFILE') or os.environ.get('SQLITE_PROFILE', 'production')
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f'Unknown SQLite profile: {profile}')
+
+    pragmas = dict(SQLITE_PROFILES[profile])
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    return pragmas
+
+def make_pragma_listener(pragmas):
+    """Build a connect-event listener that applies the given PRAGMAs"""
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    return set_sqlite_pragmas
+
+def _is_sqlite_file(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:') \
+        and 'mode=memory' not in str(url)
+
+def init_db_engine(app, db):
+    """Initialize db on app with the configured SQLite engine profile.
+
+    Pool and connect options must be in the config before db.init_app()
+    builds the engines; the PRAGMA hook is then attached to every
+    file-backed SQLite engine, including any SQLALCHEMY_BINDS.
+    """
+    uris = [app.config['SQLALCHEMY_DATABASE_URI']] + list(app.config.get('SQLALCHEMY_BINDS', {}).values())
+    if not any(_is_sqlite_file(make_url(uri)) for uri in uris):
+        db.init_app(app)
+        return
+
+    pragmas = get_sqlite_pragmas(app)
+    options = dict(SQLITE_POOL_OPTIONS)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    connect_args = dict(options.get('connect_args', {}))
+    connect_args.setdefault('check_same_thread', False)
+    if 'busy_timeout' in pragmas:
+        connect_args.setdefault('timeout', pragmas['busy_timeout'] / 1000)
+    options['connect_args'] = connect_args
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    db.init_app(app)
+
+    if pragmas:
+        with app.app_context():
+            for engine in db.engines.values():
+                if _is_sqlite_file(engine.url):
+                    event.listen(engine, 'connect', make_pragma_listener(pragmas))
@@ -0,0 +1,115 @@
+from flask import request, send_file
+from src.compression import ETAG_SUFFIXES
+import hashlib
+import json
+import mimetypes
+import os
+import re
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Vite's default output names: assets/[name]-[hash].[ext] with an 8 character base64url hash
+VITE_ASSETS_DIR = 'assets/'
+VITE_HASHED_NAME = re.compile(r'.+-[A-Za-z0-9_-]{8}$')
+# build.manifest output of Vite 5+, then Vite 4
+VITE_MANIFESTS = ('.vite/manifest.json', 'manifest.json')
+
+def is_content_hashed(relative):
+    """True for Vite output like assets/index-CAsf2Vxk.js, whose content can never change under that name"""
+    if not relative.startswith(VITE_ASSETS_DIR):
+        return False
+    return bool(VITE_HASHED_NAME.match(os.path.splitext(os.path.basename(relative))[0]))
+
+def manifest_files(static_folder):
+    """Every file a Vite build manifest lists, or None when the build has no manifest"""
+    for name in VITE_MANIFESTS:
+        path = os.path.join(static_folder, name)
+        if not os.path.isfile(path):
+            continue
+        with open(path) as f:
+            chunks = json.load(f)
+        files = set()
+        for chunk in chunks.values():
+            files.add(chunk['file'])
+            files.update(chunk.get('css', ()))
+            files.update(chunk.get('assets', ()))
+        return files
+    return None
+
+class StaticAsset:
+    __slots__ = ('path', 'mimetype', 'immutable')
+
+    def __init__(self, path, mimetype, immutable):
+        self.path = path
+        self.mimetype = mimetype
+        self.immutable = immutable
+
+class StaticAssetIndex:
+    """Index of the SPA's static files, built once at startup.
+
+    Requests resolve with a dict lookup instead of filesystem probes.
+    Content-hashed files are cached by clients forever, and index.html is
+    held in memory and always revalidated. With a Vite build manifest only
+    the files it lists count as hashed; without one, names must match
+    Vite's default assets/[name]-[hash].[ext] format.
+    """
+
+    def __init__(self, static_folder, precompressed=None):
+        self.static_folder = static_folder
+        self.precompressed = precompressed
+        self.assets = {}
+        self.index_html = None
+        self.index_etag = None
+
+        if not static_folder or not os.path.isdir(static_folder):
+            return
+
+        hashed = manifest_files(static_folder)
+        for root, _, files in os.walk(static_folder):
+            for name in files:
+                if name.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, static_folder).replace(os.sep, '/')
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                immutable = relative in hashed if hashed is not None else is_content_hashed(relative)
+                self.assets[relative] = StaticAsset(path, mimetype, immutable)
+
+        if 'index.html' in self.assets:
+            with open(self.assets['index.html'].path, 'rb') as f:
+                self.index_html = f.read()
+            self.index_etag = hashlib.sha1(self.index_html).hexdigest()
+
+    def response(self, app, path):
+        """Response for path, falling back to index.html for SPA routes; None without an index.html"""
+        asset = self.assets.get(path) if path and path != 'index.html' else None
+        if asset is None:
+            return self._index_response(app)
+
+        response = None
+        if self.precompressed is not None:
+            response = self.precompressed.response(app, path)
+        if response is None:
+            response = send_file(asset.path, mimetype=asset.mimetype, conditional=True)
+
+        if asset.immutable:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
+
+    def _index_response(self, app):
+        if self.index_html is None:
+            return None
+
+        response = None
+        if self.precompressed is not None:
+            response = self.precompressed.response(app, 'index.html')
+        if response is None:
+            response = app.response_class(self.index_html, mimetype='text/html')
+        response.set_etag(self.index_etag + ETAG_SUFFIXES.get(response.headers.get('Content-Encoding'), ''))
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
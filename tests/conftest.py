@@ -0,0 +1,60 @@
+import os
+import sys
+# Same layout as main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+import pytest
+from flask import Flask
+from src.models.user import db
+from src.models.migrations import upgrade_database
+from src.routes.incidents import incidents_bp
+from src.routes.bulk import bulk_bp
+from src.middleware.auth import JWT_SECRET
+from src.sqlite_profile import init_db_engine
+from src.json_codec import FastJSONProvider
+from src.compression import init_compression
+
+@pytest.fixture(scope='session')
+def app():
+    """The API blueprints on in-memory hot and archive databases, without Socket.IO"""
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_BINDS'] = {'archive': 'sqlite://'}
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    init_compression(app)
+    app.register_blueprint(incidents_bp, url_prefix='/api')
+    app.register_blueprint(bulk_bp, url_prefix='/api')
+    init_db_engine(app, db)
+    with app.app_context():
+        upgrade_database()
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def auth_headers(unit_id, unit_type):
+    token = jwt.encode({'unit_id': unit_id, 'unit_type': unit_type}, JWT_SECRET, algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+@pytest.fixture(scope='session')
+def dispatch_headers():
+    return auth_headers('DISPATCH-1', 'dispatch')
+
+@pytest.fixture
+def admin_headers():
+    return auth_headers('ADMIN', 'admin')
+
+@pytest.fixture
+def create_incident(client, dispatch_headers):
+    """Create an incident through the API and return its JSON"""
+    def create(**fields):
+        body = {'incident_type': 'Structure Fire', 'location': 'Main St', 'address': '100 Main St',
+                'priority': 2, 'units_requested': 1}
+        body.update(fields)
+        response = client.post('/api/incidents', json=body, headers=dispatch_headers)
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()
+    return create
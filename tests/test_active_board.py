@@ -0,0 +1,25 @@
+from src.models.user import db
+from src.models.incident import Incident
+
+def test_board_is_priority_then_oldest_first(app, client, dispatch_headers, create_incident):
+    low = create_incident(priority=3)
+    high = create_incident(priority=1)
+    older_medium = create_incident(priority=2)
+    newer_medium = create_incident(priority=2)
+    cleared = create_incident(priority=1)
+    assert client.delete(f"/api/incidents/{cleared['id']}").status_code == 200
+
+    ids = [incident['id'] for incident in client.get('/api/incidents', headers=dispatch_headers).get_json()]
+    ours = [incident_id for incident_id in ids
+            if incident_id in {low['id'], high['id'], older_medium['id'], newer_medium['id'], cleared['id']}]
+    assert ours == [high['id'], older_medium['id'], newer_medium['id'], low['id']]
+
+    with app.app_context():
+        assert [incident.id for incident in Incident.active_board()] == ids
+
+def test_board_query_reads_the_status_priority_index(app):
+    with app.app_context():
+        statement = Incident.active_board().statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+        plan = ' '.join(row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {statement}')))
+    assert 'ix_incident_status_priority_created_at' in plan
+    assert 'TEMP B-TREE' not in plan
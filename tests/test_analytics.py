@@ -0,0 +1,49 @@
+from src.models.analytics import rebuild_response_rollups, response_time_rollups
+
+def run_call(client, incident, unit):
+    path = f"/api/incidents/{incident['id']}"
+    assert client.post(f'{path}/respond', json={'user_id': unit, 'unit_number': 'E9'}).status_code == 200
+    assert client.patch(f'{path}/status', json={'user_id': unit, 'status': 'on_scene'}).status_code == 200
+    assert client.patch(f'{path}/status', json={'user_id': unit, 'status': 'clear'}).status_code == 200
+
+def test_summaries_by_unit_and_call_type(client, dispatch_headers, create_incident):
+    for _ in range(3):
+        run_call(client, create_incident(incident_type='Elevator Rescue'), 'FM-20')
+
+    response = client.get('/api/analytics/response-times', query_string={'dimension': 'unit', 'key': 'FM-20'},
+                          headers=dispatch_headers)
+    assert response.status_code == 200
+    metrics = {row['metric']: row for row in response.get_json()}
+    assert set(metrics) == {'turnout', 'travel', 'response', 'on_scene'}
+    for row in metrics.values():
+        assert row['count'] == 3
+        assert 0 <= row['min_seconds'] <= row['p50_seconds'] <= row['max_seconds']
+
+    response = client.get('/api/analytics/response-times',
+                          query_string={'dimension': 'call_type', 'key': 'Elevator Rescue', 'metric': 'turnout'},
+                          headers=dispatch_headers)
+    assert [row['count'] for row in response.get_json()] == [3]
+
+    response = client.get('/api/analytics/response-times', query_string={'dimension': 'station'},
+                          headers=dispatch_headers)
+    assert response.status_code == 400
+
+def test_rebuild_after_archive_keeps_history(app, client, admin_headers, create_incident):
+    archived = create_incident(incident_type='Chimney Fire')
+    run_call(client, archived, 'FM-21')
+    assert client.delete(f"/api/incidents/{archived['id']}").status_code == 200
+    live = create_incident(incident_type='Chimney Fire')
+    run_call(client, live, 'FM-21')
+
+    with app.app_context():
+        before = response_time_rollups('unit', key='FM-21')
+    assert [row['count'] for row in before] == [2, 2, 2, 2]
+
+    response = client.post('/api/archive', json={'older_than_days': 0}, headers=admin_headers)
+    assert response.get_json()['archived'] >= 1
+    assert client.get(f"/api/incidents/{archived['id']}").get_json()['id'] == archived['id']
+
+    with app.app_context():
+        rebuild_response_rollups()
+        assert response_time_rollups('unit', key='FM-21') == before
+        assert [row['count'] for row in response_time_rollups('call_type', key='Chimney Fire')] == [2, 2, 2, 2]
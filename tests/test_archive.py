@@ -0,0 +1,44 @@
+from src.models.user import db
+from src.models.incident import Incident, TimelineEntry, IncidentResponse, ArchivedIncident
+from src.archive import archive_cleared_incidents
+
+def test_archived_incidents_read_back_unchanged(app, client, admin_headers, create_incident):
+    incident = create_incident(incident_type='Dumpster Fire')
+    path = f"/api/incidents/{incident['id']}"
+    client.post(f'{path}/respond', json={'user_id': 'FM-60', 'unit_number': 'E60'})
+    client.post(f'{path}/timeline', json={'type': 'note', 'content': 'Extinguished', 'user': 'FM-60'})
+    assert client.delete(path).status_code == 200
+    before = client.get(path).get_json()
+    create_incident()  # The newest incident always stays hot
+
+    response = client.post('/api/archive', json={'older_than_days': 0}, headers=admin_headers)
+    assert response.status_code == 200 and response.get_json()['archived'] >= 1
+    with app.app_context():
+        assert db.session.get(Incident, incident['id']) is None
+        assert TimelineEntry.query.filter_by(incident_id=incident['id']).count() == 0
+        assert IncidentResponse.query.filter_by(incident_id=incident['id']).count() == 0
+        assert db.session.get(ArchivedIncident, incident['id']).to_summary_dict()['archived']
+
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.get_json() == before
+    assert client.get(path, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+def test_only_old_cleared_incidents_are_archived(app, client, create_incident):
+    active = create_incident()
+    cleared = create_incident()
+    assert client.delete(f"/api/incidents/{cleared['id']}").status_code == 200
+    newest = create_incident()
+    assert client.delete(f"/api/incidents/{newest['id']}").status_code == 200
+
+    with app.app_context():
+        assert archive_cleared_incidents(older_than_days=30) == 0
+        assert archive_cleared_incidents(older_than_days=0) >= 1
+        assert db.session.get(Incident, active['id']) is not None
+        assert db.session.get(Incident, cleared['id']) is None
+        # Archiving the highest id would let SQLite hand it to the next incident
+        assert db.session.get(Incident, newest['id']) is not None
+        assert archive_cleared_incidents(older_than_days=0) == 0
+
+def test_archive_needs_admin(client, dispatch_headers):
+    assert client.post('/api/archive', json={'older_than_days': 0}, headers=dispatch_headers).status_code == 403
@@ -0,0 +1,62 @@
+import json
+from src.board_cache import ActiveBoardCache
+from src.payload_cache import IncidentPayload
+from src.routes.incidents import active_board_cache
+from src.models.incident import db, Incident
+
+def assert_board_matches_database(app):
+    with app.app_context():
+        cached = [payload.data for payload in active_board_cache.get_board()]
+        assert cached == [incident.to_dict() for incident in Incident.active_board()]
+
+def test_board_matches_database_after_every_write(app, client, dispatch_headers, admin_headers, create_incident):
+    assert_board_matches_database(app)
+
+    first = create_incident(priority=3)
+    second = create_incident(priority=1, location='Pier 4')
+    assert_board_matches_database(app)
+
+    assert client.put(f"/api/incidents/{first['id']}", json={'priority': 1}).status_code == 200
+    assert client.post(f"/api/incidents/{second['id']}/respond",
+                       json={'user_id': 'FM-3', 'unit_number': 'E3'}).status_code == 200
+    assert_board_matches_database(app)
+
+    assert client.delete(f"/api/incidents/{second['id']}").status_code == 200
+    assert client.put(f"/api/incidents/{first['id']}", json={'status': 'cleared'}).status_code == 200
+    assert_board_matches_database(app)
+
+    rows = [{'incident_type': 'Hazmat', 'location': 'Rail Yard', 'address': '1 Depot Rd', 'priority': 2,
+             'status': 'active', 'timeline': [{'type': 'note', 'content': 'imported'}]},
+            {'incident_type': 'Assault', 'location': 'Park', 'address': '2 Elm St', 'priority': 3}]
+    response = client.post('/api/incidents/import', data='\n'.join(json.dumps(row) for row in rows),
+                           headers=admin_headers)
+    assert response.get_json()['imported'] == 2
+    assert_board_matches_database(app)
+
+def payload(incident, version, **changes):
+    data = dict(incident.to_dict(), **changes)
+    return IncidentPayload(incident.id, version, data)
+
+def test_out_of_order_stores_keep_the_newest(app, create_incident):
+    created = create_incident()
+    with app.app_context():
+        cache = ActiveBoardCache()
+        cache.get_board()
+        incident = db.session.get(Incident, created['id'])
+        base = cache._version
+
+        cache.store(payload(incident, base + 11, priority=1))
+        cache.store(payload(incident, base + 10, priority=3))
+        board = {p.incident_id: p for p in cache.get_board()}
+        assert board[incident.id].version == base + 11
+        assert board[incident.id].data['priority'] == 1
+
+        # A late active write must not bring back an incident cleared after it
+        cache.store(payload(incident, base + 13, status='cleared'))
+        cache.store(payload(incident, base + 12))
+        assert incident.id not in {p.incident_id for p in cache.get_board()}
+
+        # Nor may a write older than what a refresh already read
+        cache._version = base + 20
+        cache.store(payload(incident, base + 14))
+        assert incident.id not in {p.incident_id for p in cache.get_board()}
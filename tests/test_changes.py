@@ -0,0 +1,62 @@
+from src.json_codec import dumps
+from src.models.incident import SyncCounter, changes_since
+
+def current_version(app):
+    with app.app_context():
+        return SyncCounter.current_version()
+
+def test_changes_since_version(app, client, dispatch_headers, create_incident):
+    since = current_version(app)
+    incident = create_incident()
+    response = client.post(f"/api/incidents/{incident['id']}/respond", json={'user_id': 'FM-30', 'unit_number': 'E30'})
+    assert response.status_code == 200
+
+    changes = client.get('/api/changes', query_string={'since': since}, headers=dispatch_headers).get_json()
+    assert [row['id'] for row in changes['incidents']] == [incident['id']]
+    assert [row['user_id'] for row in changes['unit_responses']] == ['FM-30']
+    assert changes['version'] == current_version(app)
+    assert not changes['more'] and not changes['resync_required']
+
+    changes = client.get('/api/changes', query_string={'since': changes['version']},
+                         headers=dispatch_headers).get_json()
+    assert changes['incidents'] == [] and changes['unit_responses'] == []
+
+def test_pages_end_on_whole_versions(app, create_incident):
+    since = current_version(app)
+    created = [create_incident()['id'] for _ in range(5)]
+
+    seen = []
+    with app.app_context():
+        while True:
+            changes = changes_since(since, limit=4)
+            # Each incident creation is one version of an incident row and its first timeline entry
+            assert len(changes['incidents']) + len(changes['timeline_entries']) <= 4
+            seen += [row['id'] for row in changes['incidents']]
+            since = changes['version']
+            if not changes['more']:
+                break
+    assert seen == created
+
+def test_oversized_version_requires_resync(app, client, admin_headers):
+    since = current_version(app)
+    body = '\n'.join(dumps({'incident_type': 'Smoke Report', 'location': 'Elm St', 'address': f'{n} Elm St',
+                            'priority': 3, 'status': 'cleared'}) for n in range(5))
+    assert client.post('/api/incidents/import', data=body, headers=admin_headers).get_json()['imported'] == 5
+
+    with app.app_context():
+        changes = changes_since(since, limit=3)
+        assert changes['resync_required']
+        assert changes['incidents'] == []
+        assert changes['version'] == SyncCounter.current_version()
+        assert len(changes_since(since)['incidents']) == 5
+
+def test_archived_incidents_are_reported_removed(app, client, dispatch_headers, admin_headers, create_incident):
+    archived = create_incident()
+    assert client.delete(f"/api/incidents/{archived['id']}").status_code == 200
+    create_incident()
+    since = current_version(app)
+
+    assert client.post('/api/archive', json={'older_than_days': 0}, headers=admin_headers).get_json()['archived'] >= 1
+    changes = client.get('/api/changes', query_string={'since': since}, headers=dispatch_headers).get_json()
+    assert {'id': archived['id'], 'reason': 'archived'} in changes['removed']
+    assert changes['version'] > since
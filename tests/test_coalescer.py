@@ -0,0 +1,73 @@
+import pytest
+from src.coalescer import IncidentEventCoalescer
+
+class FakeSocketIO:
+    """Records emits; background tasks wait until the test runs them, so windows close on demand"""
+
+    def __init__(self):
+        self.emitted = []
+        self.tasks = []
+
+    def emit(self, event, data, room=None):
+        self.emitted.append((event, data, room))
+
+    def start_background_task(self, target, *args):
+        self.tasks.append((target, args))
+
+    def sleep(self, seconds):
+        pass
+
+    def close_windows(self):
+        tasks, self.tasks = self.tasks, []
+        for target, args in tasks:
+            target(*args)
+
+@pytest.fixture
+def socketio():
+    return FakeSocketIO()
+
+@pytest.fixture
+def events(socketio):
+    events = IncidentEventCoalescer(window=0.05)
+    events.init_app(socketio)
+    return events
+
+def test_lone_event_is_sent_unchanged(events, socketio):
+    events.publish(1, 'incident_update', {'id': 1})
+    assert socketio.emitted == []
+    socketio.close_windows()
+    assert socketio.emitted == [('incident_update', {'id': 1}, 'general')]
+
+def test_burst_becomes_one_batch(events, socketio):
+    events.publish(1, 'incident_update', {'id': 1, 'v': 1})
+    events.publish(1, 'unit_response', {'user_id': 'FM-1'})
+    events.publish(1, 'incident_update', {'id': 1, 'v': 2})
+    events.publish(2, 'incident_update', {'id': 2})
+    socketio.close_windows()
+
+    assert socketio.emitted == [
+        ('incident_batch', {'incident_id': 1, 'events': [
+            {'event': 'unit_response', 'data': {'user_id': 'FM-1'}},
+            {'event': 'incident_update', 'data': {'id': 1, 'v': 2}}
+        ]}, 'general'),
+        ('incident_update', {'id': 2}, 'general')
+    ]
+    stats = events.stats()
+    assert (stats['received'], stats['packets'], stats['batches'], stats['superseded']) == (4, 2, 1, 1)
+    assert stats['merged'] == 2 and stats['pending_incidents'] == 0
+
+def test_urgent_events_skip_the_window_in_order(events, socketio):
+    events.publish(3, 'unit_response', {'user_id': 'FM-2'})
+    events.publish(3, 'incident_created', {'id': 3, 'priority': 1}, urgent=True)
+    assert [event for event, _, _ in socketio.emitted] == ['unit_response', 'incident_created']
+    socketio.close_windows()
+    assert len(socketio.emitted) == 2
+    assert events.stats()['bypassed'] == 1
+
+def test_zero_window_sends_immediately(socketio):
+    events = IncidentEventCoalescer(window=0, room='board')
+    events.init_app(socketio)
+    events.publish(4, 'incident_update', {'id': 4})
+    events.publish(4, 'incident_update', {'id': 4})
+    assert socketio.emitted == [('incident_update', {'id': 4}, 'board')] * 2
+    assert socketio.tasks == []
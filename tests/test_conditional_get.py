@@ -0,0 +1,55 @@
+import pytest
+from src import board_cache
+from src.routes import incidents as incident_routes
+from src.board_cache import ActiveBoardCache
+from src.payload_cache import IncidentPayloadCache
+from src.models.incident import Incident
+
+@pytest.fixture
+def to_dict_calls(monkeypatch):
+    """Ids passed to Incident.to_dict(), with empty caches so any full read has to serialize"""
+    calls = []
+    original = Incident.to_dict
+
+    def to_dict(self):
+        calls.append(self.id)
+        return original(self)
+
+    monkeypatch.setattr(Incident, 'to_dict', to_dict)
+    payloads = IncidentPayloadCache()
+    monkeypatch.setattr(incident_routes, 'incident_payloads', payloads)
+    monkeypatch.setattr(board_cache, 'incident_payloads', payloads)
+    monkeypatch.setattr(incident_routes, 'active_board_cache', ActiveBoardCache())
+    return calls
+
+@pytest.mark.parametrize('suffix', ['', '-gzip'])
+def test_incident_304_skips_to_dict(client, create_incident, to_dict_calls, monkeypatch, suffix):
+    incident = create_incident()
+    etag = client.get(f"/api/incidents/{incident['id']}").headers['ETag'].strip('"')
+    to_dict_calls.clear()
+
+    response = client.get(f"/api/incidents/{incident['id']}", headers={'If-None-Match': f'"{etag}{suffix}"'})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert to_dict_calls == []
+
+    # A mismatch does serialize, so the spy is live
+    monkeypatch.setattr(incident_routes, 'incident_payloads', IncidentPayloadCache())
+    response = client.get(f"/api/incidents/{incident['id']}", headers={'If-None-Match': '"incident-0-0"'})
+    assert response.status_code == 200
+    assert to_dict_calls == [incident['id']]
+
+@pytest.mark.parametrize('suffix', ['', '-gzip'])
+def test_board_304_skips_to_dict(client, dispatch_headers, create_incident, to_dict_calls, suffix):
+    create_incident()
+    etag = client.get('/api/incidents', headers=dispatch_headers).headers['ETag'].strip('"')
+    to_dict_calls.clear()
+
+    headers = dict(dispatch_headers, **{'If-None-Match': f'"{etag}{suffix}"'})
+    response = client.get('/api/incidents', headers=headers)
+    assert response.status_code == 304
+    assert to_dict_calls == []
+
+    # Any write moves the collection ETag on
+    create_incident()
+    assert client.get('/api/incidents', headers=headers).status_code == 200
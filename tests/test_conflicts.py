@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+import time
+import pytest
+from flask import Flask
+from sqlalchemy.exc import IntegrityError, OperationalError
+from src import board_cache
+from src.board_cache import ActiveBoardCache
+from src.json_codec import FastJSONProvider
+from src.models.incident import Incident
+from src.models.migrations import upgrade_database
+from src.models.user import db
+from src.payload_cache import IncidentPayloadCache
+from src.routes import incidents as incident_routes
+from src.routes.incidents import incidents_bp, is_lost_race
+from src.sqlite_profile import init_db_engine
+
+def integrity_error(message):
+    return IntegrityError('INSERT ...', {}, sqlite3.IntegrityError(message))
+
+def test_only_race_constraints_are_lost_races():
+    assert is_lost_race(integrity_error('UNIQUE constraint failed: timeline_entry.incident_id, timeline_entry.seq'))
+    assert is_lost_race(integrity_error(
+        'UNIQUE constraint failed: incident_response.incident_id, incident_response.user_id'))
+    assert is_lost_race(integrity_error('duplicate key value violates unique constraint '
+                                        '"uq_timeline_entry_incident_seq"'))
+    assert not is_lost_race(integrity_error('NOT NULL constraint failed: timeline_entry.entry_type'))
+    assert is_lost_race(OperationalError('UPDATE ...', {}, sqlite3.OperationalError('database is locked')))
+    assert not is_lost_race(OperationalError('UPDATE ...', {}, sqlite3.OperationalError('no such table: x')))
+
+def test_validation_errors_are_not_retried(client, create_incident):
+    incident = create_incident()
+    for path, body in ((f"/api/incidents/{incident['id']}/timeline", {'type': None, 'content': 'x', 'user': 'FM-1'}),
+                       (f"/api/incidents/{incident['id']}/respond", {'user_id': None, 'unit_number': 'E1'})):
+        start = time.perf_counter()
+        response = client.post(path, json=body)
+        assert response.status_code == 400, response.get_json()
+        assert 'NOT NULL' in response.get_json()['error']
+        assert time.perf_counter() - start < 0.2
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    """The incident routes on file-backed databases, so concurrent requests get their own connections"""
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+    app.config['SQLALCHEMY_BINDS'] = {'archive': f"sqlite:///{tmp_path / 'archive.db'}"}
+    init_db_engine(app, db)
+    app.register_blueprint(incidents_bp, url_prefix='/api')
+    with app.app_context():
+        upgrade_database()
+    # The caches are keyed by incident id and version, which this database reuses
+    payloads = IncidentPayloadCache()
+    monkeypatch.setattr(incident_routes, 'incident_payloads', payloads)
+    monkeypatch.setattr(board_cache, 'incident_payloads', payloads)
+    monkeypatch.setattr(incident_routes, 'active_board_cache', ActiveBoardCache())
+    return app
+
+def test_concurrent_writers_all_land(file_app, dispatch_headers):
+    threads = 8
+    client = file_app.test_client()
+    headers = dispatch_headers
+    body = {'incident_type': 'Structure Fire', 'location': 'Main St', 'address': '100 Main St',
+            'priority': 2, 'units_requested': threads}
+    incident_id = client.post('/api/incidents', json=body, headers=headers).get_json()['id']
+    path = f'/api/incidents/{incident_id}'
+    barrier = threading.Barrier(threads)
+    statuses = []
+
+    def writer(n):
+        client = file_app.test_client()
+        barrier.wait()
+        statuses.append(client.post('/api/incidents', json=body, headers=headers).status_code)
+        statuses.append(client.post(f'{path}/respond', json={'user_id': f'FM-{n}', 'unit_number': f'E{n}'}).status_code)
+        statuses.append(client.post(f'{path}/units', json={'units': [{'user_id': f'DU-{n}', 'unit_number': f'L{n}'}]},
+                                    headers=headers).status_code)
+        statuses.append(client.post(f'{path}/timeline', json={'type': 'note', 'content': f'note {n}',
+                                                              'user': f'FM-{n}'}).status_code)
+
+    workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(set(statuses)) == [200, 201]
+    incident = client.get(path).get_json()
+    assert sorted(unit['user_id'] for unit in incident['responding_units']) == sorted(
+        [f'FM-{n}' for n in range(threads)] + [f'DU-{n}' for n in range(threads)])
+    assert [entry['id'] for entry in incident['timeline']] == list(range(1, len(incident['timeline']) + 1))
+    assert sorted(entry['content'] for entry in incident['timeline'] if entry['type'] == 'note') == sorted(
+        f'note {n}' for n in range(threads))
+    with file_app.app_context():
+        assert Incident.query.count() == threads + 1
@@ -0,0 +1,66 @@
+import pytest
+from src.routes import incidents as incident_routes
+
+@pytest.fixture
+def published(monkeypatch):
+    """(incident_id, event, data) published to the coalescer, as if Socket.IO were running"""
+    events = []
+
+    class Recorder:
+        def publish(self, incident_id, event, data, urgent=False):
+            events.append((incident_id, event, data))
+
+        def emit(self, event, data, **kwargs):
+            pass
+
+    recorder = Recorder()
+    monkeypatch.setattr(incident_routes, 'get_socketio', lambda: recorder)
+    monkeypatch.setattr(incident_routes, 'incident_events', recorder)
+    return events
+
+def dispatch(client, headers, incident, body):
+    return client.post(f"/api/incidents/{incident['id']}/units", json=body, headers=headers)
+
+def test_batch_assigns_and_updates_in_one_transaction(client, dispatch_headers, create_incident, published):
+    incident = create_incident()
+    assert dispatch(client, dispatch_headers, incident,
+                    {'units': [{'user_id': 'FM-4', 'unit_number': 'E4'}, {'user_id': 'FM-5'}]}).status_code == 200
+    del published[:]
+
+    response = dispatch(client, dispatch_headers, incident, {'units': [
+        {'user_id': 'FM-4', 'status': 'on_scene'},
+        {'user_id': 'FM-5', 'status': 'clear'},
+        {'user_id': 'FM-6', 'unit_number': 'T6'}
+    ]})
+    assert response.status_code == 200
+    units = {unit['user_id']: unit['status'] for unit in response.get_json()['responding_units']}
+    assert units == {'FM-4': 'on_scene', 'FM-5': 'clear', 'FM-6': 'responding'}
+    assert len(response.get_json()['timeline']) == 5
+
+    # One event for the whole batch
+    assert [event for _, event, _ in published] == ['incident_patch']
+    assert published[0][2]['from_version'] < published[0][2]['version']
+
+def test_invalid_item_rejects_the_whole_batch(client, dispatch_headers, create_incident, published):
+    incident = create_incident()
+    del published[:]
+    response = dispatch(client, dispatch_headers, incident, {'units': [
+        {'user_id': 'FM-7'}, {'user_id': 'FM-8', 'status': 'on_scene'}, {'user_id': 'FM-7'}
+    ]})
+    assert response.status_code == 400
+    assert [error['index'] for error in response.get_json()['errors']] == [1, 2]
+    assert client.get(f"/api/incidents/{incident['id']}").get_json()['responding_units'] == []
+    assert published == []
+
+@pytest.mark.parametrize('body', [
+    [], 'units', None, {}, {'units': {}}, {'units': []}, {'units': ['FM-1']}, {'units': [None]},
+    {'units': [{'user_id': ['FM-1']}]}, {'units': [{'user_id': 'FM-1', 'unit_number': {'a': 1}}]}
+])
+def test_malformed_bodies_are_rejected(client, dispatch_headers, create_incident, body):
+    incident = create_incident()
+    response = dispatch(client, dispatch_headers, incident, body)
+    assert response.status_code == 400, response.get_json()
+
+def test_dispatch_requires_dispatch_or_admin(client, create_incident):
+    incident = create_incident()
+    assert client.post(f"/api/incidents/{incident['id']}/units", json={'units': [{'user_id': 'FM-1'}]}).status_code == 401
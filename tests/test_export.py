@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+from src.routes.bulk import EXPORT_COLUMNS, iter_export_records
+from src.routes.incidents import history_filters
+
+def add_activity(client, incident):
+    path = f"/api/incidents/{incident['id']}"
+    assert client.post(f'{path}/timeline', json={'type': 'note', 'content': 'Victim in water',
+                                                 'user': 'FM-50'}).status_code == 200
+    assert client.post(f'{path}/respond', json={'user_id': 'FM-50', 'unit_number': 'R50'}).status_code == 200
+
+def export(client, headers, **params):
+    response = client.get('/api/incidents/export', query_string=params, headers=headers)
+    assert response.status_code == 200
+    return response
+
+def test_ndjson_matches_incident_reads(client, dispatch_headers, create_incident):
+    incident = create_incident(incident_type='Water Rescue')
+    add_activity(client, incident)
+    payload = client.get(f"/api/incidents/{incident['id']}").get_json()
+
+    response = export(client, dispatch_headers, incident_type='Water Rescue')
+    assert response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [record['record_type'] for record in records] == (
+        ['incident'] + ['timeline_entry'] * len(payload['timeline']) + ['unit_response'])
+    assert records[0]['incident_id'] == incident['id'] and records[0]['status'] == 'active'
+    assert [record['content'] for record in records[1:-1]] == [entry['content'] for entry in payload['timeline']]
+    assert (records[-1]['user_id'], records[-1]['unit_status']) == ('FM-50', 'responding')
+
+def test_csv_has_the_same_records(client, dispatch_headers, create_incident):
+    add_activity(client, create_incident(incident_type='Ice Rescue'))
+    ndjson = [json.loads(line) for line in export(client, dispatch_headers, incident_type='Ice Rescue')
+              .get_data(as_text=True).splitlines()]
+
+    response = export(client, dispatch_headers, incident_type='Ice Rescue', format='csv')
+    assert response.mimetype == 'text/csv'
+    reader = csv.DictReader(io.StringIO(response.get_data(as_text=True)))
+    assert reader.fieldnames == EXPORT_COLUMNS
+    rows = list(reader)
+    assert [(row['record_type'], row['incident_id'], row['content'] or row['user_id'])
+            for row in rows] == [(record['record_type'], str(record['incident_id']),
+                                  record.get('content') or record.get('user_id') or '') for record in ndjson]
+
+def test_batches_do_not_change_the_records(app, client, create_incident):
+    for _ in range(5):
+        add_activity(client, create_incident(incident_type='Cliff Rescue'))
+    with app.app_context():
+        filters = history_filters({'incident_type': 'Cliff Rescue'}, default_status='all')
+        assert list(iter_export_records(filters, batch_size=2)) == list(iter_export_records(filters))
+
+def test_rejects_bad_requests(client, dispatch_headers):
+    assert client.get('/api/incidents/export', query_string={'format': 'xml'},
+                      headers=dispatch_headers).status_code == 400
+    assert client.get('/api/incidents/export', query_string={'since': 'yesterday'},
+                      headers=dispatch_headers).status_code == 400
+    assert client.get('/api/incidents/export').status_code == 401
@@ -0,0 +1,86 @@
+import pytest
+from src.models.user import db
+from src.models.incident import Unit
+from src.models.geo import bounding_box, distance_km
+
+# An empty patch of ocean, so incidents from other tests never fall in range
+ORIGIN = (-30.0, -20.0)
+
+def offset(north_km, east_km):
+    """Point roughly north_km north and east_km east of ORIGIN"""
+    lat = ORIGIN[0] + north_km / 111.2
+    return lat, ORIGIN[1] + east_km / (111.2 * 0.866)  # cos(30°)
+
+def nearby(client, headers, path='/api/incidents/nearby', **params):
+    response = client.get(path, query_string=dict(params, lat=ORIGIN[0], lon=ORIGIN[1]), headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+@pytest.fixture(scope='module')
+def placed(app, dispatch_headers):
+    """Incident ids by name, at increasing distances from ORIGIN"""
+    client = app.test_client()
+    ids = {}
+    for name, (north, east) in {'near': (1, 0), 'mid': (0, 5), 'far': (-40, 0), 'distant': (300, 0)}.items():
+        lat, lon = offset(north, east)
+        response = client.post('/api/incidents', headers=dispatch_headers, json={
+            'incident_type': 'Boat Fire', 'location': name, 'address': 'Offshore', 'priority': 2,
+            'units_requested': 1, 'latitude': lat, 'longitude': lon})
+        ids[name] = response.get_json()['id']
+    return ids
+
+def test_nearest_without_radius(client, dispatch_headers, placed):
+    hits = nearby(client, dispatch_headers, limit=3)
+    assert [hit['incident']['id'] for hit in hits] == [placed['near'], placed['mid'], placed['far']]
+    assert [round(hit['distance_km']) for hit in hits] == [1, 5, 40]
+    # Growing the search box reaches rows far outside the starting radius
+    assert [hit['incident']['id'] for hit in nearby(client, dispatch_headers, limit=4)][-1] == placed['distant']
+
+def test_radius_is_a_circle_not_a_box(client, dispatch_headers, create_incident, placed):
+    lat, lon = offset(4, 4)  # Inside the 5 km box, 5.7 km away
+    corner = create_incident(incident_type='Boat Fire', latitude=lat, longitude=lon)
+    assert distance_km(*ORIGIN, lat, lon) > 5
+    hits = nearby(client, dispatch_headers, radius_km=5.1)
+    assert [hit['incident']['id'] for hit in hits] == [placed['near'], placed['mid']]
+    assert corner['id'] not in [hit['incident']['id'] for hit in nearby(client, dispatch_headers, radius_km=5.5)]
+
+def test_index_follows_moves_and_status(client, dispatch_headers, create_incident, placed):
+    incident = create_incident(incident_type='Boat Fire', latitude=ORIGIN[0], longitude=ORIGIN[1])
+    assert nearby(client, dispatch_headers, limit=1)[0]['incident']['id'] == incident['id']
+
+    far_lat, far_lon = offset(-100, 0)
+    assert client.put(f"/api/incidents/{incident['id']}", json={'latitude': far_lat, 'longitude': far_lon}
+                      ).status_code == 200
+    assert nearby(client, dispatch_headers, limit=1)[0]['incident']['id'] == placed['near']
+
+    assert client.put(f"/api/incidents/{incident['id']}", json={'latitude': ORIGIN[0], 'longitude': ORIGIN[1]}
+                      ).status_code == 200
+    assert client.delete(f"/api/incidents/{incident['id']}").status_code == 200
+    assert nearby(client, dispatch_headers, limit=1)[0]['incident']['id'] == placed['near']
+    assert nearby(client, dispatch_headers, limit=1, status='cleared')[0]['incident']['id'] == incident['id']
+
+def test_nearest_units(app, client, dispatch_headers):
+    with app.app_context():
+        for unit_id, unit_type in (('GEO-1', 'fire_marshal'), ('GEO-2', 'fire_marshal'), ('GEO-3', 'dispatch')):
+            db.session.add(Unit(unit_id=unit_id, unit_name=unit_id, unit_type=unit_type))
+        db.session.commit()
+    for unit_id, north in (('GEO-1', 3), ('GEO-2', 1), ('GEO-3', 0)):
+        lat, lon = offset(north, 0)
+        response = client.put(f'/api/units/{unit_id}/location', json={'latitude': lat, 'longitude': lon},
+                              headers=dispatch_headers)
+        assert response.status_code == 200
+
+    hits = nearby(client, dispatch_headers, path='/api/units/nearby', limit=2, unit_type='fire_marshal')
+    assert [hit['unit']['unit_id'] for hit in hits] == ['GEO-2', 'GEO-1']
+
+def test_bounding_box():
+    min_lat, max_lat, min_lon, max_lon = bounding_box(*ORIGIN, 10)
+    for north, east in ((10, 0), (-10, 0), (0, 10), (0, -10)):
+        lat, lon = offset(north * 0.99, east * 0.99)
+        assert min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+    assert bounding_box(89.99, 0, 10)[2:] == (-180.0, 180.0)
+
+@pytest.mark.parametrize('params', [{}, {'lat': 91, 'lon': 0}, {'lat': 'x', 'lon': 0},
+                                    {'lat': 0, 'lon': 0, 'radius_km': 0}])
+def test_bad_arguments(client, dispatch_headers, params):
+    assert client.get('/api/incidents/nearby', query_string=params, headers=dispatch_headers).status_code == 400
@@ -0,0 +1,53 @@
+from src.models.user import db
+from src.models.incident import Incident
+from src.routes.incidents import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+
+def test_cursor_walks_history_newest_first(client, dispatch_headers, create_incident):
+    created = [create_incident(incident_type='Brush Fire', priority=n % 3 + 1)['id'] for n in range(7)]
+    query = {'incident_type': 'Brush Fire', 'limit': 3}
+
+    seen = []
+    pages = 0
+    while True:
+        response = client.get('/api/incidents', query_string=query, headers=dispatch_headers)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= 3
+        seen += [incident['id'] for incident in page]
+        pages += 1
+        if 'X-Next-Cursor' not in response.headers:
+            break
+        query['cursor'] = response.headers['X-Next-Cursor']
+    assert seen == created[::-1]
+    assert pages == 3
+
+def test_filters(client, dispatch_headers, create_incident):
+    urgent = create_incident(incident_type='Gas Leak', priority=1)
+    routine = create_incident(incident_type='Gas Leak', priority=3)
+    assert client.delete(f"/api/incidents/{routine['id']}").status_code == 200
+
+    def ids(**params):
+        response = client.get('/api/incidents', query_string=dict(params, incident_type='Gas Leak'),
+                              headers=dispatch_headers)
+        return [incident['id'] for incident in response.get_json()]
+
+    assert ids() == [urgent['id']]
+    assert ids(status='cleared') == [routine['id']]
+    assert ids(status='all') == [routine['id'], urgent['id']]
+    assert ids(status='all', priority=3) == [routine['id']]
+    assert ids(status='all', until=urgent['created_at']) == []
+
+def test_bad_cursor_and_limit(client, dispatch_headers):
+    response = client.get('/api/incidents', query_string={'cursor': 'not-a-cursor'}, headers=dispatch_headers)
+    assert response.status_code == 400
+    response = client.get('/api/incidents', query_string={'limit': 'ten'}, headers=dispatch_headers)
+    assert response.status_code == 400
+    response = client.get('/api/incidents', query_string={'status': 'all', 'limit': 10 ** 6},
+                          headers=dispatch_headers)
+    assert len(response.get_json()) <= MAX_PAGE_SIZE
+
+def test_cursor_round_trip(app, create_incident):
+    incident_id = create_incident()['id']
+    with app.app_context():
+        incident = db.session.get(Incident, incident_id)
+        assert decode_cursor(encode_cursor(incident)) == (incident.created_at, incident.id)
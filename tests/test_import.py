@@ -0,0 +1,65 @@
+import json
+from src.json_codec import dumps
+
+def ndjson(*rows):
+    return '\n'.join(row if isinstance(row, str) else dumps(row) for row in rows) + '\n'
+
+def export_records(client, headers, incident_type):
+    response = client.get('/api/incidents/export', query_string={'incident_type': incident_type},
+                          headers=headers)
+    records = {}
+    for line in response.get_data(as_text=True).splitlines():
+        record = json.loads(line)
+        records.setdefault(record.pop('incident_id'), []).append(record)
+    return records
+
+def test_export_import_round_trip(client, dispatch_headers, admin_headers, create_incident):
+    incident = create_incident(incident_type='Trench Rescue', pertinent_details='Collapse at 3m')
+    path = f"/api/incidents/{incident['id']}"
+    client.post(f'{path}/respond', json={'user_id': 'FM-70', 'unit_number': 'R70'})
+    client.patch(f'{path}/status', json={'user_id': 'FM-70', 'status': 'on_scene'})
+    client.post(f'{path}/timeline', json={'type': 'resource_request', 'content': 'Shoring', 'user': 'FM-70'})
+    assert client.delete(path).status_code == 200
+
+    response = client.post('/api/incidents/import', data=ndjson(client.get(path).get_json()), headers=admin_headers)
+    assert response.get_json() == {'imported': 1, 'failed': 0, 'errors': []}
+
+    records = export_records(client, dispatch_headers, 'Trench Rescue')
+    assert len(records) == 2
+    original, imported = records.pop(incident['id']), next(iter(records.values()))
+    assert imported == original
+
+def test_invalid_rows_are_reported_and_skipped(client, dispatch_headers, admin_headers):
+    valid = {'incident_type': 'Mutual Aid', 'location': 'County Line', 'address': '1 County Rd', 'priority': 2}
+    body = ndjson(valid,
+                  dict(valid, priority=7),
+                  '{not json',
+                  '',
+                  dict(valid, location=''),
+                  dict(valid, responding_units=[{'user_id': 'FM-1'}, {'user_id': 'FM-1'}]),
+                  dict(valid, created_at='last tuesday'),
+                  dict(valid, status='active', timeline=[{'type': 'note', 'content': 'Staged'}]))
+    result = client.post('/api/incidents/import', data=body, headers=admin_headers).get_json()
+
+    assert (result['imported'], result['failed']) == (2, 5)
+    assert [error['line'] for error in result['errors']] == [2, 3, 5, 6, 7]
+    assert 'priority' in result['errors'][0]['error']
+    assert 'FM-1' in result['errors'][3]['error']
+
+    records = export_records(client, dispatch_headers, 'Mutual Aid')
+    statuses = sorted(rows[0]['status'] for rows in records.values())
+    assert statuses == ['active', 'cleared']
+    active = next(rows for rows in records.values() if rows[0]['status'] == 'active')
+    assert [(row['record_type'], row.get('content')) for row in active] == [('incident', None),
+                                                                           ('timeline_entry', 'Staged')]
+
+def test_import_needs_admin(client, dispatch_headers):
+    response = client.post('/api/incidents/import', data=ndjson({'incident_type': 'X'}), headers=dispatch_headers)
+    assert response.status_code == 403
+
+def test_rows_the_database_rejects_fail_alone(client, admin_headers):
+    valid = {'incident_type': 'Standby', 'location': 'Stadium', 'address': '1 Stadium Way', 'priority': 3}
+    body = ndjson(valid, dict(valid, pertinent_details={'not': 'text'}), valid)
+    result = client.post('/api/incidents/import', data=body, headers=admin_headers).get_json()
+    assert (result['imported'], result['failed']) == (2, 1)
+    assert result['errors'][0]['line'] == 2
@@ -0,0 +1,20 @@
+import json
+import pytest
+from src import json_codec
+from src.json_codec import RawJSON, dumps
+
+@pytest.fixture(params=['default', 'json'])
+def backend(request, monkeypatch):
+    """Run with the installed encoder and again with stdlib json"""
+    if request.param == 'json':
+        monkeypatch.setattr(json_codec, 'orjson', None)
+    return request.param
+
+def test_raw_json_is_spliced(backend):
+    text = dumps({'a': RawJSON('{"big":1}'), 'b': [RawJSON('[2]')]})
+    assert json.loads(text) == {'a': {'big': 1}, 'b': [[2]]}
+
+def test_user_strings_are_never_spliced(backend):
+    forged = ['\x00rawjson:0\x00', '\x00rawjson:0123456789abcdef:0\x00']
+    document = {'a': RawJSON('{"big":1}'), 'notes': forged}
+    assert json.loads(dumps(document)) == {'a': {'big': 1}, 'notes': forged}
@@ -0,0 +1,73 @@
+import copy
+import json
+import random
+import pytest
+from src.json_patch import make_patch, apply_patch
+
+SCALARS = [None, True, False, 0, 1, 1.0, 0.0, -2, 2.5, '', '1', 'a/b', 'm~n', 'true']
+KEYS = ['a', 'b', 'c/d', 'e~f', '~1', '']
+
+def random_value(rng, depth=0):
+    kind = rng.random()
+    if depth < 3 and kind < 0.25:
+        return {key: random_value(rng, depth + 1) for key in rng.sample(KEYS, rng.randint(0, 4))}
+    if depth < 3 and kind < 0.45:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return rng.choice(SCALARS)
+
+def mutate(rng, value, depth=0):
+    """A variant of value sharing most of its structure, as an incident update would"""
+    if isinstance(value, dict) and depth < 3 and rng.random() < 0.8:
+        changed = {key: mutate(rng, item, depth + 1) if rng.random() < 0.5 else item
+                   for key, item in value.items() if rng.random() < 0.9}
+        if rng.random() < 0.3:
+            changed[rng.choice(KEYS)] = random_value(rng, depth + 1)
+        return changed
+    if isinstance(value, list) and depth < 3 and rng.random() < 0.8:
+        changed = [mutate(rng, item, depth + 1) if rng.random() < 0.5 else item for item in value]
+        if rng.random() < 0.3:
+            changed.append(random_value(rng, depth + 1))
+        if changed and rng.random() < 0.2:
+            changed.pop()
+        return changed
+    return random_value(rng, depth)
+
+def assert_round_trip(old, new):
+    patch = make_patch(old, new)
+    # Patches travel as JSON
+    patched = apply_patch(copy.deepcopy(old), json.loads(json.dumps(patch)))
+    assert json.dumps(patched, sort_keys=True) == json.dumps(new, sort_keys=True)
+
+@pytest.mark.parametrize('old, new', [
+    ({'a': True}, {'a': 1}),
+    ({'a': 0}, {'a': False}),
+    ({'a': 1}, {'a': 1.0}),
+    ([1, True], [True, 1]),
+    ({'a': {'b': [0]}}, {'a': {'b': [False]}}),
+    ({'a/b': 1, 'c~d': 2}, {'a/b': 2}),
+    ([1, 2, 3], [1]),
+    ([1], [1, 2, 3]),
+    ({'a': 1}, [1]),
+    (None, {'a': 1})
+])
+def test_round_trip(old, new):
+    assert_round_trip(old, new)
+
+def test_random_round_trips():
+    rng = random.Random(2025)
+    for _ in range(20000):
+        old = random_value(rng)
+        assert_round_trip(old, mutate(rng, old))
+
+def test_unchanged_documents_need_no_operations():
+    document = {'status': 'active', 'timeline': [{'id': 1, 'content': 'x'}], 'priority': 1}
+    assert make_patch(document, copy.deepcopy(document)) == []
+
+def test_appends_and_field_changes_stay_small():
+    old = {'priority': 2, 'timeline': [{'id': 1}], 'units': [{'status': 'responding'}]}
+    new = {'priority': 1, 'timeline': [{'id': 1}, {'id': 2}], 'units': [{'status': 'on_scene'}]}
+    assert make_patch(old, new) == [
+        {'op': 'replace', 'path': '/priority', 'value': 1},
+        {'op': 'add', 'path': '/timeline/-', 'value': {'id': 2}},
+        {'op': 'replace', 'path': '/units/0/status', 'value': 'on_scene'}
+    ]
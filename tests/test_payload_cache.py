@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+from src.json_codec import dumps
+from src.models.user import db
+from src.models.incident import Incident
+from src.payload_cache import IncidentPayloadCache
+
+class Row(SimpleNamespace):
+    """Just enough of an Incident row for the cache, counting serializations"""
+    calls = 0
+
+    def to_dict(self):
+        Row.calls += 1
+        return {'id': self.id, 'change_version': self.change_version}
+
+def test_one_serialization_per_version():
+    cache = IncidentPayloadCache()
+    Row.calls = 0
+    first = cache.get(Row(id=1, change_version=5))
+    assert cache.get(Row(id=1, change_version=5)) is first
+    assert cache.peek(1, 5) is first
+    assert cache.get(Row(id=1, change_version=6)) is not first
+    assert Row.calls == 2
+    assert cache.stats() == {'size': 2, 'maxsize': 1024, 'hits': 2, 'misses': 2}
+
+def test_least_recently_used_versions_age_out():
+    cache = IncidentPayloadCache(maxsize=2)
+    for incident_id in (1, 2):
+        cache.get(Row(id=incident_id, change_version=1))
+    cache.peek(1, 1)
+    cache.get(Row(id=3, change_version=1))
+    assert cache.peek(2, 1) is None
+    assert cache.peek(1, 1) is not None and cache.peek(3, 1) is not None
+
+def test_payloads_encode_once_and_splice_unchanged(app, client, create_incident):
+    incident_id = create_incident()['id']
+    client.post(f'/api/incidents/{incident_id}/timeline', json={'type': 'note', 'content': 'é "quoted"', 'user': 'FM-1'})
+    with app.app_context():
+        payload = IncidentPayloadCache().get(db.session.get(Incident, incident_id))
+        assert payload.text is payload.text
+        assert dumps({'incident': payload}) == dumps({'incident': payload.data})
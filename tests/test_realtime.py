@@ -0,0 +1,44 @@
+import json
+import time
+import pytest
+from flask import Flask
+from flask_socketio import SocketIO, join_room
+from src import json_codec
+from src.payload_cache import IncidentPayload
+from src.realtime import is_shared_queue
+
+pytest.importorskip('kombu')
+
+POLLING = '/socket.io/?EIO=4&transport=polling'
+
+def make_server(channel):
+    app = Flask(__name__)
+    server = SocketIO(app, message_queue='memory://', channel=channel, json=json_codec, async_mode='threading')
+
+    @server.on('connect')
+    def connect(auth=None):
+        join_room('general')
+
+    return app, server
+
+def test_emits_reach_clients_of_another_server(request):
+    channel = f'test-{request.node.name}-{time.time()}'
+    app, _ = make_server(channel)
+    _, other = make_server(channel)
+
+    http = app.test_client()
+    url = f"{POLLING}&sid={json.loads(http.get(POLLING).get_data(as_text=True)[1:])['sid']}"
+    http.post(url, data='40')
+    assert http.get(url).get_data(as_text=True).startswith('40')
+    time.sleep(0.2)  # Let the listener subscribe
+
+    payload = IncidentPayload(5, 12, {'id': 5, 'status': 'active', 'timeline': []})
+    other.emit('incident_update', payload, to='general')
+    body = http.get(url).get_data(as_text=True)
+    assert json.loads(body[2:]) == ['incident_update', {'id': 5, 'status': 'active', 'timeline': []}]
+
+def test_is_shared_queue():
+    assert is_shared_queue('redis://localhost:6379/0')
+    assert is_shared_queue('amqp://guest@localhost//')
+    assert not is_shared_queue('memory://')
+    assert not is_shared_queue(None)
@@ -0,0 +1,52 @@
+import json
+from src.models.user import db
+from src.models.incident import Incident
+from src.models.migrations import migrate_responding_unit_blobs
+
+def test_unit_lifecycle(client, create_incident):
+    incident = create_incident()
+    path = f"/api/incidents/{incident['id']}"
+    assert client.post(f'{path}/respond', json={'user_id': 'FM-40', 'unit_number': 'E40'}).status_code == 200
+    response = client.post(f'{path}/respond', json={'user_id': 'FM-40', 'unit_number': 'E40'})
+    assert response.status_code == 400
+
+    assert client.patch(f'{path}/status', json={'user_id': 'FM-40', 'status': 'on_scene'}).status_code == 200
+    units = client.get(path).get_json()['responding_units']
+    assert [(unit['user_id'], unit['unit_number'], unit['status']) for unit in units] == [('FM-40', 'E40', 'on_scene')]
+    assert units[0]['on_scene_at'] is not None and units[0]['cleared_at'] is None
+
+    assert client.patch(f'{path}/status', json={'user_id': 'FM-41', 'status': 'clear'}).status_code == 404
+
+def test_responses_are_looked_up_by_user(app, client, create_incident):
+    incident = create_incident()
+    for unit in ('FM-42', 'FM-43'):
+        client.post(f"/api/incidents/{incident['id']}/respond", json={'user_id': unit, 'unit_number': 'L1'})
+
+    with app.app_context():
+        incident = db.session.get(Incident, incident['id'])
+        assert incident.get_response('FM-43').user_id == 'FM-43'
+        assert incident.get_response('FM-44') is None
+        assert set(incident.get_responses(['FM-42', 'FM-43', 'FM-44'])) == {'FM-42', 'FM-43'}
+
+def test_legacy_blobs_become_rows(app):
+    blob = [{'user_id': 'FM-1', 'unit_number': 'E1', 'status': 'on_scene', 'responded_at': '2024-05-01T14:00:00',
+             'on_scene_at': '2024-05-01T14:06:00'},
+            {'user_id': 'FM-1', 'unit_number': 'E1', 'status': 'responding', 'responded_at': '2024-05-01T14:01:00'},
+            {'user_id': 'FM-2', 'unit_number': 'L2', 'status': 'clear', 'responded_at': '2024-05-01T14:02:00',
+             'cleared_at': '2024-05-01T15:00:00'}]
+    with app.app_context():
+        incident = Incident(incident_type='Vehicle Fire', location='Pine St', address='9 Pine St', priority=2,
+                            units_requested=2, created_by='DISPATCH-1', responding_units=json.dumps(blob))
+        db.session.add(incident)
+        db.session.commit()
+        incident_id = incident.id
+
+        assert migrate_responding_unit_blobs() == 1
+        assert migrate_responding_unit_blobs() == 0
+        incident = db.session.get(Incident, incident_id)
+        assert incident.responding_units is None
+        # A unit listed twice keeps its first entry
+        units = incident.to_dict()['responding_units']
+        assert [(unit['user_id'], unit['status']) for unit in units] == [('FM-1', 'on_scene'), ('FM-2', 'clear')]
+        assert units[0]['on_scene_at'].isoformat() == '2024-05-01T14:06:00'
+        assert units[1]['cleared_at'].isoformat() == '2024-05-01T15:00:00'
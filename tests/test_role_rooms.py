@@ -0,0 +1,71 @@
+import pytest
+from flask import Flask
+from flask_socketio import SocketIO
+from src import socketio_events
+from src.coalescer import IncidentEventCoalescer
+from src.models.user import db
+from src.models.incident import Unit
+from src.socketio_events import register_socketio_events
+
+@pytest.fixture
+def socket_app(tmp_path, monkeypatch):
+    """Socket.IO events on their own database, with a roster of fire marshals and dispatchers"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+    app.config['SQLALCHEMY_BINDS'] = {'archive': f"sqlite:///{tmp_path / 'archive.db'}"}
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        # Beyond the FM-1..25 and DISPATCH-1..5 ranges the notifications used to loop over
+        for unit_id, unit_type in (('FM-1', 'fire_marshal'), ('FM-40', 'fire_marshal'), ('DISPATCH-9', 'dispatch')):
+            db.session.add(Unit(unit_id=unit_id, unit_name=unit_id, unit_type=unit_type))
+        db.session.commit()
+
+    socketio = SocketIO(app, async_mode='threading')
+    register_socketio_events(socketio)
+    events = IncidentEventCoalescer(window=0)
+    events.init_app(socketio)
+    monkeypatch.setattr(socketio_events, 'incident_events', events)
+    return app, socketio
+
+def connect(app, socketio, user_id=None):
+    client = socketio.test_client(app)
+    if user_id:
+        client.emit('join_user_room', {'user_id': user_id})
+    client.get_received()
+    return client
+
+def notifications(client):
+    return [message['args'][0] for message in client.get_received() if message['name'] == 'push_notification']
+
+def test_notifications_reach_each_role_once(socket_app):
+    marshals = [connect(*socket_app, 'FM-1'), connect(*socket_app, 'FM-40')]
+    dispatcher = connect(*socket_app, 'DISPATCH-9')
+    unknown = connect(*socket_app, 'FM-999')
+    sender = connect(*socket_app)
+
+    sender.emit('incident_created', {'incident_id': 7, 'incident_type': 'Structure Fire', 'location': 'Main St',
+                                     'priority': 2})
+    for client in marshals:
+        assert [notification['type'] for notification in notifications(client)] == ['new_incident']
+    assert notifications(dispatcher) == []
+    assert notifications(unknown) == []
+
+    sender.emit('unit_responded', {'incident_id': 7, 'user_id': 'FM-1', 'unit_number': 'E1',
+                                   'incident_type': 'Structure Fire'})
+    assert [notification['type'] for notification in notifications(dispatcher)] == ['unit_response']
+    assert all(notifications(client) == [] for client in marshals)
+
+def test_leaving_drops_the_role_room(socket_app):
+    marshal = connect(*socket_app, 'FM-40')
+    marshal.emit('leave_user_room', {'user_id': 'FM-40'})
+    connect(*socket_app).emit('incident_created', {'incident_id': 8, 'priority': 3})
+    assert notifications(marshal) == []
+
+def test_role_and_user_helpers(socket_app):
+    app, socketio = socket_app
+    marshal = connect(app, socketio, 'FM-1')
+    socketio_events.send_role_notification(socketio, 'fire_marshal', {'type': 'drill'})
+    socketio_events.send_push_notification(socketio, 'FM-1', {'type': 'direct'})
+    socketio_events.send_role_notification(socketio, 'dispatch', {'type': 'not for marshals'})
+    assert [notification['type'] for notification in notifications(marshal)] == ['drill', 'direct']
@@ -0,0 +1,44 @@
+def search(client, dispatch_headers, text):
+    response = client.get('/api/incidents/search', query_string={'q': text}, headers=dispatch_headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def test_archive_then_append_then_search(client, dispatch_headers, admin_headers, create_incident):
+    archived = create_incident(location='Quarry Road')
+    live = create_incident(location='Harbor Walk')
+
+    # The archived incident holds the newest timeline entry, so its id is the one SQLite hands out next
+    response = client.post(f"/api/incidents/{archived['id']}/timeline",
+                           json={'type': 'note', 'content': 'smoke from the zebra barn', 'user': 'FM-1'})
+    assert response.status_code == 200
+    assert client.delete(f"/api/incidents/{archived['id']}").status_code == 200
+    response = client.post('/api/archive', json={'older_than_days': 0}, headers=admin_headers)
+    assert response.get_json()['archived'] >= 1
+
+    response = client.post(f"/api/incidents/{live['id']}/timeline",
+                           json={'type': 'note', 'content': 'hydrant near the okapi pen', 'user': 'FM-2'})
+    assert response.status_code == 200
+    response = client.post(f"/api/incidents/{live['id']}/respond", json={'user_id': 'FM-2', 'unit_number': 'E2'})
+    assert response.status_code == 200
+
+    results = search(client, dispatch_headers, 'okapi')
+    assert [result['incident']['id'] for result in results] == [live['id']]
+
+    # The archived incident left the live index with its notes and is found in the archive's own
+    for text in ('zebra barn', 'quarry'):
+        results = search(client, dispatch_headers, text)
+        assert [result['incident']['id'] for result in results] == [archived['id']]
+        assert results[0]['incident']['archived'] is True
+        assert '[' in results[0]['snippet']
+        assert results[0]['score'] > 0
+
+def test_archived_results_follow_live_ones(client, dispatch_headers, admin_headers, create_incident):
+    archived = create_incident(location='Lighthouse Point', pertinent_details='tide gauge flooding')
+    assert client.delete(f"/api/incidents/{archived['id']}").status_code == 200
+    live = create_incident(location='Lighthouse Point')
+    client.post('/api/archive', json={'older_than_days': 0}, headers=admin_headers)
+
+    results = search(client, dispatch_headers, 'lighthouse')
+    assert [result['incident']['id'] for result in results] == [live['id'], archived['id']]
+    assert [result['incident'].get('archived') for result in results] == [None, True]
+    assert [result['incident']['id'] for result in search(client, dispatch_headers, 'tide gauge')] == [archived['id']]
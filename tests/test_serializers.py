@@ -0,0 +1,83 @@
+import base64
+import json
+import pytest
+import socketio
+from socketio import packet
+from werkzeug.test import Client
+from src import json_codec
+from src.serializers import enable_msgpack_negotiation, MsgPackPacket
+
+msgpack = pytest.importorskip('msgpack')
+
+RECORD_SEPARATOR = '\x1e'
+
+class PollingClient:
+    """An Engine.IO long-polling client speaking JSON or MessagePack Socket.IO packets"""
+
+    def __init__(self, http, serializer):
+        self.http = http
+        self.serializer = serializer
+        query = '&serializer=msgpack' if serializer == 'msgpack' else ''
+        body = http.get(f'/socket.io/?EIO=4&transport=polling{query}').get_data(as_text=True)
+        assert body[0] == '0'
+        self.sid = json.loads(body[1:])['sid']
+        self.send(packet.CONNECT)
+        assert [pkt['type'] for pkt in self.receive()] == [packet.CONNECT]
+
+    def send(self, packet_type, data=None):
+        if self.serializer == 'msgpack':
+            encoded = 'b' + base64.b64encode(MsgPackPacket(packet_type, data=data).encode()).decode()
+        else:
+            encoded = '4' + packet.Packet(packet_type, data=data).encode()
+        response = self.http.post(f'/socket.io/?EIO=4&transport=polling&sid={self.sid}', data=encoded)
+        assert response.status_code == 200
+
+    def receive(self):
+        """Socket.IO packets waiting for this client, as {'type', 'data'} dicts"""
+        body = self.http.get(f'/socket.io/?EIO=4&transport=polling&sid={self.sid}').get_data(as_text=True)
+        packets = []
+        for record in body.split(RECORD_SEPARATOR):
+            if record.startswith('b'):
+                decoded = msgpack.loads(base64.b64decode(record[1:]))
+                packets.append({'type': decoded['type'], 'data': decoded.get('data')})
+            else:
+                assert self.serializer == 'json' and record[0] == '4'
+                pkt = packet.Packet(encoded_packet=record[1:])
+                packets.append({'type': pkt.packet_type, 'data': pkt.data})
+        return packets
+
+@pytest.fixture
+def server():
+    server = socketio.Server(async_mode='threading', json=json_codec)
+    enable_msgpack_negotiation(server)
+
+    @server.on('join')
+    def join(sid, room):
+        server.enter_room(sid, room)
+        return 'joined'
+
+    return server
+
+def test_json_and_msgpack_clients_get_the_same_broadcast(server):
+    http = Client(socketio.WSGIApp(server))
+    clients = [PollingClient(http, 'json'), PollingClient(http, 'msgpack')]
+    for client in clients:
+        client.send(packet.EVENT, ['join', 'general'])
+    assert len(server.manager.rooms['/']['general']) == 2
+
+    update = {'incident_id': 7, 'status': 'active', 'priority': 1, 'units': ['FM-1', 'FM-2'], 'ratio': 0.5}
+    server.emit('incident_update', update, room='general')
+    received = [client.receive() for client in clients]
+    assert received[0] == received[1] == [{'type': packet.EVENT, 'data': ['incident_update', update]}]
+
+def test_msgpack_is_refused_without_the_package(server, monkeypatch):
+    monkeypatch.setattr('src.serializers.MsgPackPacket', None)
+    http = Client(socketio.WSGIApp(server))
+    response = http.get('/socket.io/?EIO=4&transport=polling&serializer=msgpack')
+    assert response.status_code == 401
+
+def test_unknown_server_internals_fail_loudly(server):
+    class Server:
+        eio = server.eio
+    with pytest.raises(RuntimeError):
+        enable_msgpack_negotiation(Server())
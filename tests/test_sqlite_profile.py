@@ -0,0 +1,44 @@
+import pytest
+from flask import Flask
+from src.models.user import db
+from src.sqlite_profile import SQLITE_POOL_OPTIONS, get_sqlite_pragmas, init_db_engine
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    return app
+
+def test_profiles_and_overrides(monkeypatch):
+    monkeypatch.delenv('SQLITE_PROFILE', raising=False)
+    assert get_sqlite_pragmas(make_app())['journal_mode'] == 'WAL'
+    assert get_sqlite_pragmas(make_app(SQLITE_PROFILE='default')) == {}
+    pragmas = get_sqlite_pragmas(make_app(SQLITE_PRAGMAS={'busy_timeout': 100, 'cache_size': -2000}))
+    assert (pragmas['busy_timeout'], pragmas['cache_size'], pragmas['synchronous']) == (100, -2000, 'NORMAL')
+
+    monkeypatch.setenv('SQLITE_PROFILE', 'default')
+    assert get_sqlite_pragmas(make_app()) == {}
+    with pytest.raises(ValueError):
+        get_sqlite_pragmas(make_app(SQLITE_PROFILE='fast'))
+
+def test_file_databases_get_the_profile(tmp_path, monkeypatch):
+    monkeypatch.delenv('SQLITE_PROFILE', raising=False)
+    app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'app.db'}",
+                   SQLALCHEMY_BINDS={'archive': f"sqlite:///{tmp_path / 'archive.db'}"})
+    init_db_engine(app, db)
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size'] == SQLITE_POOL_OPTIONS['pool_size']
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['connect_args'] == {'check_same_thread': False, 'timeout': 5}
+
+    with app.app_context():
+        for engine in db.engines.values():
+            with engine.connect() as connection:
+                assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+                assert connection.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+                assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 1  # NORMAL
+
+def test_memory_databases_are_left_alone():
+    app = make_app(SQLALCHEMY_DATABASE_URI='sqlite://')
+    init_db_engine(app, db)
+    assert 'pool_size' not in app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'memory'
@@ -0,0 +1,78 @@
+import json
+import pytest
+from flask import Flask
+from src.compression import PrecompressedAssets
+from src.static_assets import IMMUTABLE_MAX_AGE, StaticAssetIndex, is_content_hashed
+
+@pytest.fixture
+def static_client(tmp_path):
+    """A client for an app serving a small SPA build the way main.py does"""
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'index.html').write_text('<html>' + 'x' * 2000 + '</html>')
+    (tmp_path / 'favicon.ico').write_bytes(b'\0icon' * 400)
+    (tmp_path / 'assets' / 'index-CAsf2Vxk.js').write_text('console.log(1);' * 200)
+
+    app = Flask(__name__, static_folder=str(tmp_path))
+    assets = StaticAssetIndex(app.static_folder, PrecompressedAssets(app.static_folder))
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        return assets.response(app, path)
+
+    return app.test_client()
+
+@pytest.mark.parametrize('path', ['favicon.ico', 'index.html'])
+@pytest.mark.parametrize('accept_encoding', ['gzip', 'identity'])
+def test_revalidatable_assets_return_304(static_client, path, accept_encoding):
+    response = static_client.get(f'/{path}', headers={'Accept-Encoding': accept_encoding})
+    assert response.status_code == 200
+    assert response.cache_control.no_cache
+    etag = response.headers['ETag']
+    assert etag
+    if accept_encoding == 'gzip':
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert etag.endswith('-gzip"')
+        assert response.last_modified is not None
+
+    response = static_client.get(f'/{path}', headers={'Accept-Encoding': accept_encoding, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+def test_gzip_and_identity_etags_differ(static_client):
+    gzipped = static_client.get('/favicon.ico', headers={'Accept-Encoding': 'gzip'})
+    plain = static_client.get('/favicon.ico', headers={'Accept-Encoding': 'identity'})
+    assert gzipped.headers['ETag'] != plain.headers['ETag']
+    response = static_client.get('/favicon.ico', headers={'Accept-Encoding': 'gzip',
+                                                          'If-None-Match': plain.headers['ETag']})
+    assert response.status_code == 200
+
+@pytest.mark.parametrize('relative, hashed', [
+    ('assets/index-CAsf2Vxk.js', True),
+    ('assets/vendor-a_b-C3d4.css', True),
+    ('assets/logo-Dallas2024.png', False),
+    ('assets/logo-2024.png', False),
+    ('assets/index.js', False),
+    ('index-CAsf2Vxk.js', False),
+])
+def test_is_content_hashed(relative, hashed):
+    assert is_content_hashed(relative) is hashed
+
+def test_hashed_assets_are_immutable(static_client):
+    response = static_client.get('/assets/index-CAsf2Vxk.js')
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == IMMUTABLE_MAX_AGE
+
+def test_manifest_decides_which_assets_are_hashed(tmp_path):
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / '.vite').mkdir()
+    for name in ('index-CAsf2Vxk.js', 'index-B9xQ2pLm.css', 'logo-Dallas24.png'):
+        (tmp_path / 'assets' / name).write_text(name)
+    (tmp_path / '.vite' / 'manifest.json').write_text(json.dumps({
+        'index.html': {'file': 'assets/index-CAsf2Vxk.js', 'css': ['assets/index-B9xQ2pLm.css']}
+    }))
+
+    assets = StaticAssetIndex(str(tmp_path)).assets
+    assert assets['assets/index-CAsf2Vxk.js'].immutable
+    assert assets['assets/index-B9xQ2pLm.css'].immutable
+    assert not assets['assets/logo-Dallas24.png'].immutable
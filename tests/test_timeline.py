@@ -0,0 +1,35 @@
+import json
+from src.models.user import db
+from src.models.incident import Incident, TimelineEntry
+from src.models.migrations import migrate_timeline_blobs
+
+def test_entries_append_in_order(client, create_incident):
+    incident = create_incident()
+    path = f"/api/incidents/{incident['id']}/timeline"
+    for n in range(3):
+        response = client.post(path, json={'type': 'note', 'content': f'note {n}', 'user': 'FM-1'})
+        assert response.status_code == 200
+
+    timeline = client.get(f"/api/incidents/{incident['id']}").get_json()['timeline']
+    assert [entry['id'] for entry in timeline] == list(range(1, len(timeline) + 1))
+    assert [(entry['type'], entry['content'], entry['user']) for entry in timeline[-3:]] == [
+        ('note', f'note {n}', 'FM-1') for n in range(3)]
+
+def test_legacy_blobs_become_rows(app):
+    blob = [{'id': 1, 'timestamp': '2024-05-01T14:00:00', 'type': 'status_update', 'content': 'Created',
+             'user': 'DISPATCH-1'},
+            {'id': 2, 'timestamp': '2024-05-01T14:05:00', 'type': 'note', 'content': 'Smoke showing', 'user': 'FM-1'}]
+    with app.app_context():
+        incident = Incident(incident_type='Structure Fire', location='Oak St', address='1 Oak St', priority=1,
+                            units_requested=1, created_by='DISPATCH-1', timeline=json.dumps(blob))
+        db.session.add(incident)
+        db.session.commit()
+        incident_id = incident.id
+
+        assert migrate_timeline_blobs() == 1
+        assert migrate_timeline_blobs() == 0
+        incident = db.session.get(Incident, incident_id)
+        assert incident.timeline is None
+        assert [(entry['id'], entry['type'], entry['content']) for entry in incident.to_dict()['timeline']] == [
+            (1, 'status_update', 'Created'), (2, 'note', 'Smoke showing')]
+        assert TimelineEntry.next_seq(incident_id) == 3